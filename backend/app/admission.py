@@ -0,0 +1,107 @@
+import asyncio
+import random
+from collections.abc import AsyncGenerator
+from fastapi import HTTPException, status
+
+from app.config import settings
+
+
+class FlushLimiter:
+    """
+    Bounded concurrency limiter for the flush path.
+    Keeps the number of concurrent flush transactions below
+    the connection pool size and sheds excess load early.
+
+    Only /time/flush is admitted here. Stats, budget and group routes
+    are not limited, they wait for a pooled connection and fail after
+    DB_POOL_TIMEOUT_SECONDS, so a herd of reads can still exhaust the
+    pool. scripts/flush_herd.py reports both sides
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float):
+        # Never admit more flushes than the pool can serve,
+        # leave at least one connection for reads
+        pool_capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+        self.max_concurrency = max(1, min(max_concurrency, pool_capacity - 1))
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+
+    @property
+    def load(self) -> float:
+        """
+        Current load factor: 0.0 when idle, 1.0 when all slots are busy,
+        above 1.0 when requests are queueing
+        """
+        return (self.in_flight + self.waiting) / self.max_concurrency
+
+    async def acquire(self) -> None:
+        """
+        Takes a flush slot. Raises 429 if the wait queue is full
+        and 503 if no slot frees up within the queue timeout
+        """
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            raise overloaded_error(status.HTTP_429_TOO_MANY_REQUESTS)
+
+        self.waiting += 1
+        try:
+            # Unlike wait_for, a timeout racing a successful acquire
+            # cannot drop the permit, so slots are never leaked
+            async with asyncio.timeout(self.queue_timeout):
+                await self._semaphore.acquire()
+        except TimeoutError:
+            raise overloaded_error(status.HTTP_503_SERVICE_UNAVAILABLE)
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+
+def jittered(seconds: float) -> int:
+    """
+    Adds random jitter to a delay so that clients
+    do not retry or sync in lockstep
+    """
+    return int(seconds + random.uniform(0, settings.SYNC_JITTER_SECONDS))
+
+def overloaded_error(status_code: int) -> HTTPException:
+    """
+    Builds a load-shedding error with a jittered Retry-After header
+    """
+    return HTTPException(
+        status_code=status_code,
+        detail="Server is busy, retry later",
+        headers={"Retry-After": str(jittered(settings.FLUSH_RETRY_AFTER_SECONDS))}
+    )
+
+def suggest_next_sync_seconds() -> int:
+    """
+    Returns server-suggested delay before the next client sync.
+    Interval stretches with flush load and is jittered to spread clients out
+    """
+    base = settings.SYNC_INTERVAL_SECONDS * (1 + flush_limiter.load)
+    return min(jittered(base), settings.SYNC_MAX_INTERVAL_SECONDS)
+
+
+flush_limiter = FlushLimiter(
+    max_concurrency=settings.FLUSH_MAX_CONCURRENCY,
+    max_queue=settings.FLUSH_MAX_QUEUE,
+    queue_timeout=settings.FLUSH_QUEUE_TIMEOUT_SECONDS
+)
+
+async def acquire_flush_slot() -> AsyncGenerator[None, None]:
+    """
+    Holds a flush slot for the duration of the request
+    """
+    await flush_limiter.acquire()
+    try:
+        yield
+    finally:
+        flush_limiter.release()
@@ -0,0 +1,143 @@
+from datetime import datetime, date
+from zoneinfo import ZoneInfo
+from sqlalchemy import select, func, or_, and_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas import BudgetState, BudgetStatus
+from app.models.budgets import DailyBudget as DailyBudgetModel, BudgetUsage as BudgetUsageModel
+from app.models.hosts import Host as HostModel
+from app.flush_batch import BucketIncrements
+
+
+async def upsert_budget_usage(
+    db: AsyncSession,
+    budget_id: int,
+    date: date,
+    used_seconds: int
+) -> None:
+    """
+    Creates new budget usage row. If exists, increments used time
+    """
+    stmt = insert(BudgetUsageModel).values(
+        budget_id=budget_id,
+        date=date,
+        used_seconds=used_seconds
+    )
+
+    upsert_stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            BudgetUsageModel.budget_id,
+            BudgetUsageModel.date,
+        ],
+        set_={
+            "used_seconds": BudgetUsageModel.used_seconds + used_seconds
+        }
+    )
+
+    await db.execute(upsert_stmt)
+
+async def apply_budget_usage(
+    db: AsyncSession,
+    increments: BucketIncrements,
+    host_ids: dict[str, int]
+) -> None:
+    """
+    Adds daily increments of flushed hosts to usage of their host
+    and group budgets. Runs in the flush transaction
+    """
+    if not host_ids:
+        return
+
+    # Budgets covering flushed hosts, directly or through their group
+    result = await db.execute(
+        select(DailyBudgetModel.id, HostModel.id)
+        .join(HostModel, or_(
+            DailyBudgetModel.host_id == HostModel.id,
+            and_(
+                DailyBudgetModel.group_id.is_not(None),
+                DailyBudgetModel.group_id == HostModel.group_id
+            )
+        ))
+        .where(HostModel.id.in_(host_ids.values()))
+    )
+    budgets_by_host = {}
+    for budget_id, host_id in result.all():
+        budgets_by_host.setdefault(host_id, []).append(budget_id)
+
+    if not budgets_by_host:
+        return
+
+    usage = {}
+    for (host, local_date), seconds in increments.daily.items():
+        for budget_id in budgets_by_host.get(host_ids[host], []):
+            usage[(budget_id, local_date)] = usage.get((budget_id, local_date), 0) + seconds
+
+    # Key order matches bucket writes, avoiding deadlocks between flushes
+    for (budget_id, local_date), seconds in sorted(usage.items()):
+        await upsert_budget_usage(db, budget_id, local_date, seconds)
+
+async def load_budget_states(db: AsyncSession, day: date) -> list[BudgetState]:
+    """
+    Returns every budget with its usage on a local date.
+    Reads only budget and usage rows, no bucket aggregation
+    """
+    result = await db.execute(
+        select(
+            DailyBudgetModel.id,
+            HostModel.name,
+            DailyBudgetModel.group_id,
+            DailyBudgetModel.limit_seconds,
+            func.coalesce(BudgetUsageModel.used_seconds, 0)
+        )
+        .outerjoin(HostModel, DailyBudgetModel.host_id == HostModel.id)
+        .outerjoin(BudgetUsageModel, and_(
+            BudgetUsageModel.budget_id == DailyBudgetModel.id,
+            BudgetUsageModel.date == day
+        ))
+        .order_by(DailyBudgetModel.id)
+    )
+
+    return [
+        BudgetState(
+            id=budget_id,
+            host=host,
+            group_id=group_id,
+            limit_seconds=limit_seconds,
+            used_seconds=used_seconds,
+            over_budget=used_seconds >= limit_seconds
+        )
+        for budget_id, host, group_id, limit_seconds, used_seconds in result.all()
+    ]
+
+async def get_hosts_over_budget(db: AsyncSession, budgets: list[BudgetState]) -> list[str]:
+    """
+    Expands used-up budgets into hostnames, group budgets cover all members
+    """
+    hosts = {budget.host for budget in budgets if budget.over_budget and budget.host}
+
+    group_ids = [budget.group_id for budget in budgets if budget.over_budget and budget.group_id]
+    if group_ids:
+        members = await db.scalars(
+            select(HostModel.name).where(HostModel.group_id.in_(group_ids))
+        )
+        hosts.update(members.all())
+
+    return sorted(hosts)
+
+async def build_budget_status(db: AsyncSession, timezone: str) -> BudgetStatus:
+    today_local = datetime.now(ZoneInfo(timezone)).date()
+    budgets = await load_budget_states(db, today_local)
+
+    return BudgetStatus(
+        date=today_local.isoformat(),
+        hosts_over_budget=await get_hosts_over_budget(db, budgets),
+        budgets=budgets
+    )
+
+async def get_over_budget_hosts(db: AsyncSession, timezone: str) -> list[str]:
+    """
+    Returns hosts whose budget is used up for the current local day
+    """
+    today_local = datetime.now(ZoneInfo(timezone)).date()
+    return await get_hosts_over_budget(db, await load_budget_states(db, today_local))
@@ -0,0 +1,212 @@
+import io
+import json
+import zlib
+
+from app.config import settings
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class DecompressionError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def supported_encodings() -> list[str]:
+    """
+    Content encodings in order of server preference
+    """
+    return (["zstd"] if zstandard is not None else []) + ["gzip"]
+
+def parse_accept_encoding(accept_encoding: str) -> dict[str, float]:
+    """
+    Maps codings of Accept-Encoding header to their q values,
+    parts with a malformed q value are ignored
+    """
+    qualities = {}
+    for part in accept_encoding.split(","):
+        coding, *params = [item.strip() for item in part.split(";")]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = None
+        if quality is not None:
+            qualities[coding.lower()] = quality
+    return qualities
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """
+    Picks response encoding from Accept-Encoding header: the highest
+    q value wins, ties go to server preference. q=0 refuses a coding,
+    * covers codings not listed explicitly
+    """
+    qualities = parse_accept_encoding(accept_encoding)
+    wildcard = qualities.get("*", 0.0)
+    candidates = [
+        (qualities.get(enc, wildcard), -index, enc)
+        for index, enc in enumerate(supported_encodings())
+    ]
+    quality, _, encoding = max(candidates)
+    return encoding if quality > 0 else None
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=settings.ZSTD_LEVEL).compress(body)
+    return zlib.compress(body, settings.GZIP_LEVEL, wbits=16 + zlib.MAX_WBITS)
+
+def decompress(body: bytes, encoding: str, limit: int) -> bytes:
+    """
+    Decompresses request body, refusing to inflate past limit bytes
+    """
+    try:
+        if encoding == "gzip":
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            data = decompressor.decompress(body, limit + 1)
+            if len(data) <= limit and not decompressor.eof:
+                raise DecompressionError(400, "Truncated gzip request body")
+        elif encoding == "zstd" and zstandard is not None:
+            reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(body))
+            data = reader.read(limit + 1)
+        else:
+            raise DecompressionError(415, f"Unsupported Content-Encoding: {encoding}")
+    except (zlib.error, getattr(zstandard, "ZstdError", zlib.error)):
+        raise DecompressionError(400, "Malformed compressed request body")
+
+    if len(data) > limit:
+        raise DecompressionError(413, "Decompressed request body too large")
+
+    return data
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that inflates compressed request bodies
+    (Content-Encoding: gzip/zstd) with a size limit and compresses
+    responses above a size threshold for clients that accept it
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.lower(): value.decode("latin-1") for key, value in scope["headers"]}
+
+        # Request side
+        content_encoding = headers.get(b"content-encoding", "").strip().lower()
+        if content_encoding and content_encoding != "identity":
+            try:
+                body = await self._read_body(receive)
+                body = decompress(body, content_encoding, settings.MAX_DECOMPRESSED_BODY_BYTES)
+            except DecompressionError as e:
+                await self._send_error(send, e.status_code, e.detail)
+                return
+
+            scope = {
+                **scope,
+                "headers": [
+                    (key, value) for key, value in scope["headers"]
+                    if key.lower() not in (b"content-encoding", b"content-length")
+                ] + [(b"content-length", str(len(body)).encode())]
+            }
+            receive = self._replay(body)
+
+        # Response side
+        encoding = choose_encoding(headers.get(b"accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        chunks = []
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            await self._send_response(send, start_message, b"".join(chunks), encoding)
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            # Compressed body can never be larger than inflated limit
+            if size > settings.MAX_DECOMPRESSED_BODY_BYTES:
+                raise DecompressionError(413, "Request body too large")
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    @staticmethod
+    def _replay(body: bytes):
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if sent:
+                return {"type": "http.disconnect"}
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        return receive
+
+    @staticmethod
+    async def _send_response(send, start_message, body: bytes, encoding: str) -> None:
+        headers = list(start_message.get("headers", []))
+        header_names = {key.lower() for key, _ in headers}
+
+        if len(body) >= settings.COMPRESSION_MIN_SIZE and b"content-encoding" not in header_names:
+            body = compress(body, encoding)
+            headers = [
+                (key, value) for key, value in headers
+                if key.lower() != b"content-length"
+            ] + [
+                (b"content-length", str(len(body)).encode()),
+                (b"content-encoding", encoding.encode()),
+                (b"vary", b"Accept-Encoding"),
+            ]
+
+        await send({**start_message, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    async def _send_error(send, status_code: int, detail: str) -> None:
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
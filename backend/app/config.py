@@ -6,4 +6,59 @@ load_dotenv()
 class Settings:
     DATABASE_URL: str = os.getenv("DATABASE_URL")
 
+    # Optional read replica for stats queries, falls back to primary
+    READ_DATABASE_URL: str | None = os.getenv("READ_DATABASE_URL")
+    READ_MAX_STALENESS_SECONDS: float = float(os.getenv("READ_MAX_STALENESS_SECONDS", "30"))
+    READ_HEALTH_CHECK_INTERVAL_SECONDS: float = float(os.getenv("READ_HEALTH_CHECK_INTERVAL_SECONDS", "5"))
+    READ_HEALTH_CHECK_TIMEOUT_SECONDS: float = float(os.getenv("READ_HEALTH_CHECK_TIMEOUT_SECONDS", "1"))
+
+    # Connection pool sizing for database engines
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+
+    # Admission control for /time/flush
+    FLUSH_MAX_CONCURRENCY: int = int(os.getenv("FLUSH_MAX_CONCURRENCY", "8"))
+    FLUSH_MAX_QUEUE: int = int(os.getenv("FLUSH_MAX_QUEUE", "32"))
+    FLUSH_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("FLUSH_QUEUE_TIMEOUT_SECONDS", "5"))
+    FLUSH_RETRY_AFTER_SECONDS: int = int(os.getenv("FLUSH_RETRY_AFTER_SECONDS", "30"))
+    FLUSH_TRANSACTION_RETRIES: int = int(os.getenv("FLUSH_TRANSACTION_RETRIES", "3"))
+    FLUSH_RETRY_BACKOFF_SECONDS: float = float(os.getenv("FLUSH_RETRY_BACKOFF_SECONDS", "0.05"))
+
+    # Server-suggested sync schedule for clients
+    SYNC_INTERVAL_SECONDS: int = int(os.getenv("SYNC_INTERVAL_SECONDS", "120"))
+    SYNC_JITTER_SECONDS: int = int(os.getenv("SYNC_JITTER_SECONDS", "30"))
+    SYNC_MAX_INTERVAL_SECONDS: int = int(os.getenv("SYNC_MAX_INTERVAL_SECONDS", "900"))
+
+    # Precomputed stats history per active timezone
+    STATS_PRECOMPUTE_ENABLED: bool = os.getenv("STATS_PRECOMPUTE_ENABLED", "true").lower() == "true"
+    STATS_CACHE_TTL_SECONDS: float = float(os.getenv("STATS_CACHE_TTL_SECONDS", "600"))
+    ACTIVE_TIMEZONE_TTL_HOURS: float = float(os.getenv("ACTIVE_TIMEZONE_TTL_HOURS", "48"))
+    MIDNIGHT_PRECOMPUTE_DELAY_SECONDS: float = float(os.getenv("MIDNIGHT_PRECOMPUTE_DELAY_SECONDS", "5"))
+
+    # Worker pool for CPU-heavy flush batch preparation
+    FLUSH_POOL_KIND: str = os.getenv("FLUSH_POOL_KIND", "process")
+    FLUSH_POOL_WORKERS: int = int(os.getenv("FLUSH_POOL_WORKERS", "2"))
+    FLUSH_OFFLOAD_THRESHOLD_BYTES: int = int(os.getenv("FLUSH_OFFLOAD_THRESHOLD_BYTES", "65536"))
+
+    # Opt-in request profiling and slow-request capture
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    SLOW_REQUEST_THRESHOLD_MS: float = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", "1000"))
+    PROFILE_MAX_CAPTURES: int = int(os.getenv("PROFILE_MAX_CAPTURES", "50"))
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "profiles")
+
+    # Request and response compression
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    GZIP_LEVEL: int = int(os.getenv("GZIP_LEVEL", "6"))
+    ZSTD_LEVEL: int = int(os.getenv("ZSTD_LEVEL", "3"))
+    MAX_DECOMPRESSED_BODY_BYTES: int = int(os.getenv("MAX_DECOMPRESSED_BODY_BYTES", str(10 * 1024 * 1024)))
+
+    # Retention: daily rows older than N years are compacted into monthly rollups
+    RETENTION_DAILY_YEARS: int = int(os.getenv("RETENTION_DAILY_YEARS", "0"))
+    RETENTION_TAIL_MAX_SECONDS: int = int(os.getenv("RETENTION_TAIL_MAX_SECONDS", "600"))
+    COMPACTION_BATCH_SIZE: int = int(os.getenv("COMPACTION_BATCH_SIZE", "5000"))
+    COMPACTION_BATCH_PAUSE_SECONDS: float = float(os.getenv("COMPACTION_BATCH_PAUSE_SECONDS", "0.1"))
+    COMPACTION_INTERVAL_SECONDS: float = float(os.getenv("COMPACTION_INTERVAL_SECONDS", "3600"))
+
 settings = Settings()
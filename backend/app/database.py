@@ -5,10 +5,32 @@ from app.config import settings
 
 
 DATABASE_URL = settings.DATABASE_URL
+READ_DATABASE_URL = settings.READ_DATABASE_URL
 
-async_engine = create_async_engine(DATABASE_URL, echo=True)
+async_engine = create_async_engine(
+    DATABASE_URL,
+    echo=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS
+)
 
 async_session_maker = async_sessionmaker(bind=async_engine, expire_on_commit=False, class_=AsyncSession)
 
+# Read-only replica engine, None when no replica is configured
+async_read_engine = create_async_engine(
+    READ_DATABASE_URL,
+    echo=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_pre_ping=True,
+    execution_options={"postgresql_readonly": True}
+) if READ_DATABASE_URL else None
+
+async_read_session_maker = async_sessionmaker(
+    bind=async_read_engine, expire_on_commit=False, class_=AsyncSession
+) if async_read_engine is not None else None
+
 class Base(DeclarativeBase):
-    pass
\ No newline at end of file
+    pass
@@ -1,7 +1,53 @@
+import asyncio
+import time
 from collections.abc import AsyncGenerator
+from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import async_session_maker
+from app.config import settings
+from app.database import async_session_maker, async_read_engine, async_read_session_maker
+
+
+# Replication lag in seconds, 0 when the read database is not a standby.
+# A caught up standby only counts as fresh while its WAL receiver is
+# streaming, otherwise nothing new may be arriving. The status column
+# is NULL unless the read role has pg_read_all_stats, such a replica
+# is never used.
+REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (
+            SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming'
+        ) THEN 'Infinity'
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 'Infinity')
+    END
+    """
+)
+
+# Time up to which the session sees committed data: last replayed
+# commit on a standby, transaction start on the primary
+SNAPSHOT_TIME_QUERY = text(
+    """
+    SELECT CASE
+        WHEN pg_is_in_recovery() THEN COALESCE(pg_last_xact_replay_timestamp(), to_timestamp(0))
+        ELSE now()
+    END
+    """
+)
+
+# SQLSTATE codes of conflicts resolved by rerunning the transaction
+SERIALIZATION_FAILURE = "40001"
+DEADLOCK_DETECTED = "40P01"
+
+# Cached replica health: (checked at monotonic time, is usable)
+_replica_state: tuple[float, bool] = (float("-inf"), False)
+
+# Lets a single request run the health check while others wait for its result
+_replica_check_lock = asyncio.Lock()
 
 
 async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
@@ -10,3 +56,67 @@ async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
     """
     async with async_session_maker() as session:
         yield session
+
+async def replica_is_usable() -> bool:
+    """
+    Checks that read replica is reachable and its replication lag
+    is within configured staleness tolerance. Result is cached
+    for a short interval to keep the check off the request path
+    """
+    global _replica_state
+
+    if async_read_engine is None:
+        return False
+
+    checked_at, usable = _replica_state
+    if time.monotonic() - checked_at < settings.READ_HEALTH_CHECK_INTERVAL_SECONDS:
+        return usable
+
+    async with _replica_check_lock:
+        # Another request may have refreshed the state while we waited
+        checked_at, usable = _replica_state
+        now = time.monotonic()
+        if now - checked_at < settings.READ_HEALTH_CHECK_INTERVAL_SECONDS:
+            return usable
+
+        # Unreachable replica must not stall requests for the driver connect timeout
+        try:
+            async with asyncio.timeout(settings.READ_HEALTH_CHECK_TIMEOUT_SECONDS):
+                async with async_read_engine.connect() as conn:
+                    lag = await conn.scalar(REPLICA_LAG_QUERY)
+            usable = float(lag) <= settings.READ_MAX_STALENESS_SECONDS
+        except Exception:
+            usable = False
+
+        _replica_state = (now, usable)
+        return usable
+
+async def get_snapshot_time(db: AsyncSession) -> datetime:
+    """
+    Returns how recent the data read by a session is. Compared with
+    flush start times taken from the app clock, so it assumes
+    database and app clocks agree
+    """
+    return await db.scalar(SNAPSHOT_TIME_QUERY)
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Creates an async session for read-only queries. Routes to
+    read replica when it is healthy and fresh enough,
+    falls back to primary database otherwise
+    """
+    if await replica_is_usable():
+        session_maker = async_read_session_maker
+    else:
+        session_maker = async_session_maker
+
+    async with session_maker() as session:
+        yield session
+
+def is_transient_conflict(error: DBAPIError) -> bool:
+    """
+    Checks whether a database error is a serialization failure
+    or a deadlock, which are safe to retry
+    """
+    sqlstate = getattr(error.orig, "sqlstate", None) or getattr(error.orig, "pgcode", None)
+    return sqlstate in (SERIALIZATION_FAILURE, DEADLOCK_DETECTED)
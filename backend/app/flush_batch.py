@@ -0,0 +1,209 @@
+import asyncio
+import json
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from collections.abc import Hashable
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from uuid import UUID
+from zoneinfo import ZoneInfo
+from pydantic import TypeAdapter, ValidationError
+
+from app.config import settings
+from app.schemas import SessionList, SessionListRecord
+from app.time_splitting import split_into_daily_buckets, split_into_slot_buckets, month_start, SLOTS_PER_DAY
+
+
+class FlushPayloadError(Exception):
+    """
+    Raised when flush payload fails validation.
+    Carries plain error dicts so it can cross process boundaries
+    """
+
+    def __init__(self, errors: list[dict]):
+        super().__init__(errors)
+        self.errors = errors
+
+
+@dataclass
+class BucketIncrements:
+    """
+    Daily, hourly and monthly bucket increments keyed by (host, date).
+    Host is a hostname during flush and a host ID during rebuild
+    """
+    daily: dict[tuple[Hashable, date], int] = field(default_factory=dict)
+    hourly: dict[tuple[Hashable, date], list[int]] = field(default_factory=dict)
+    monthly: dict[tuple[Hashable, date], int] = field(default_factory=dict)
+
+    def add_session(self, host: Hashable, start: datetime, end: datetime, timezone: str) -> None:
+        """
+        Splits a session and adds its time to the increments
+        """
+        # Split into local daily buckets
+        for local_date, seconds in split_into_daily_buckets(start, end, timezone):
+            if seconds <= 0:
+                continue
+
+            day_key = (host, local_date)
+            self.daily[day_key] = self.daily.get(day_key, 0) + seconds
+
+            month_key = (host, month_start(local_date))
+            self.monthly[month_key] = self.monthly.get(month_key, 0) + seconds
+
+        # Collect UTC quarter-hour slots per host and date
+        for utc_date, slot, seconds in split_into_slot_buckets(start, end):
+            slots = self.hourly.setdefault((host, utc_date), [0] * SLOTS_PER_DAY)
+            slots[slot] += seconds
+
+    def merge(self, other: "BucketIncrements") -> None:
+        for key, seconds in other.daily.items():
+            self.daily[key] = self.daily.get(key, 0) + seconds
+
+        for key, seconds in other.monthly.items():
+            self.monthly[key] = self.monthly.get(key, 0) + seconds
+
+        for key, other_slots in other.hourly.items():
+            slots = self.hourly.setdefault(key, [0] * SLOTS_PER_DAY)
+            for slot, seconds in enumerate(other_slots):
+                slots[slot] += seconds
+
+    @property
+    def hosts(self) -> set[Hashable]:
+        return {host for host, _ in self.daily} | {host for host, _ in self.hourly}
+
+
+@dataclass
+class PreparedBatch:
+    """
+    Flush payload split and aggregated into bucket increments,
+    keyed by hostname since host IDs are resolved later
+    """
+    total: int
+    timezone: str
+    accepted: int = 0
+    rejected_session_ids: list[UUID] = field(default_factory=list)
+    increments: BucketIncrements = field(default_factory=BucketIncrements)
+    # Accepted sessions as (host, id, start, end) for the raw session log
+    sessions: list[tuple[str, UUID, datetime, datetime]] = field(default_factory=list)
+    earliest_start: datetime | None = None
+
+
+# Built once, validates straight into dicts without model instances
+# or Python-level validators
+SESSION_LIST_ADAPTER = TypeAdapter(SessionListRecord)
+
+
+def json_invalid_error(pos: int, msg: str) -> dict:
+    """
+    Error FastAPI reports for a JSON body it cannot decode
+    """
+    return {"type": "json_invalid", "loc": ("body", pos), "msg": "JSON decode error", "input": {}, "ctx": {"error": msg}}
+
+def validate_session_list(body: bytes) -> SessionListRecord:
+    """
+    Validates flush payload on the fast path. Payloads it rejects are
+    decoded and validated again the way FastAPI validates a SessionList
+    body, so clients get the same 422 errors as before
+    """
+    try:
+        payload = SESSION_LIST_ADAPTER.validate_json(body)
+    except ValidationError:
+        payload = None
+
+    # Same check as Session.validate_end_timestamp
+    if payload is None or any(
+        session["end"] < session["start"] for session in payload.get("sessions", ())
+    ):
+        # FastAPI treats an empty body as a missing one
+        if not body:
+            raise FlushPayloadError([{"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}])
+
+        try:
+            data = json.loads(body)
+        except json.JSONDecodeError as e:
+            raise FlushPayloadError([json_invalid_error(e.pos, e.msg)])
+        except UnicodeDecodeError as e:
+            raise FlushPayloadError([json_invalid_error(e.start, e.reason)])
+
+        try:
+            payload = SessionList.model_validate(data).model_dump()
+        except ValidationError as e:
+            raise FlushPayloadError([
+                {**error, "loc": ("body", *error["loc"])}
+                for error in e.errors(include_url=False)
+            ])
+
+    return payload
+
+def prepare_flush_batch(body: bytes) -> PreparedBatch:
+    """
+    Validates raw flush payload and turns sessions into
+    aggregated daily, hourly and monthly bucket increments.
+    CPU-bound and free of I/O, so it can run in a worker pool
+    """
+    payload = validate_session_list(body)
+    timezone = payload["timezone"]
+
+    # Fails with ZoneInfoNotFoundError before any splitting
+    ZoneInfo(timezone)
+
+    batch = PreparedBatch(total=payload["total"], timezone=timezone)
+    processed_session_ids = set()
+
+    for session in payload.get("sessions", ()):
+        session_id, host, start, end = session["id"], session["host"], session["start"], session["end"]
+
+        # REMAKE DE-DUPLICATION TO WORK ACROSS MULTIPLE REQUESTS
+        if session_id in processed_session_ids:
+            batch.rejected_session_ids.append(session_id)
+            continue
+
+        # Reject session if timestamps invalid
+        if end <= start:
+            batch.rejected_session_ids.append(session_id)
+            continue
+
+        batch.increments.add_session(host, start, end, timezone)
+        batch.sessions.append((host, session_id, start, end))
+
+        batch.accepted += 1
+        processed_session_ids.add(session_id)
+
+        if batch.earliest_start is None or start < batch.earliest_start:
+            batch.earliest_start = start
+
+    return batch
+
+
+_executor: Executor | None = None
+
+def get_executor() -> Executor:
+    """
+    Lazily creates the configured worker pool for batch preparation
+    """
+    global _executor
+
+    if _executor is None:
+        if settings.FLUSH_POOL_KIND == "process":
+            _executor = ProcessPoolExecutor(max_workers=settings.FLUSH_POOL_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=settings.FLUSH_POOL_WORKERS)
+
+    return _executor
+
+def shutdown_executor() -> None:
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+async def run_prepare_flush_batch(body: bytes) -> PreparedBatch:
+    """
+    Prepares small payloads inline and offloads large ones
+    to the worker pool, keeping the event loop free for I/O
+    """
+    if len(body) < settings.FLUSH_OFFLOAD_THRESHOLD_BYTES:
+        return prepare_flush_batch(body)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), prepare_flush_batch, body)
@@ -1,18 +1,64 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
 
-from .routers import time
+from .config import settings
+from .database import async_engine, async_read_engine
+from .routers import time, groups, budgets, profiles
+from .scheduler import run_stats_precompute
+from .retention import run_retention
+from .flush_batch import shutdown_executor
+from .profiling import ProfilingMiddleware, instrument_engine
+from .compression import CompressionMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Starts background stats precompute and retention jobs for
+    the app lifetime and shuts down flush worker pool on exit
+    """
+    tasks = []
+    if settings.STATS_PRECOMPUTE_ENABLED:
+        tasks.append(asyncio.create_task(run_stats_precompute()))
+    if settings.RETENTION_DAILY_YEARS > 0:
+        tasks.append(asyncio.create_task(run_retention()))
+
+    yield
+
+    for task in tasks:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    shutdown_executor()
 
 
 app = FastAPI(
     title="Burner - Time Tracker",
     description="App designed to discourage you from wasting time online",
     version="0.1",
+    lifespan=lifespan,
     openapi_tags=[
         {
             "name": "time",
             "description": "Endpoints for managing time data (flushing sessions, pulling statistics)."
         },
+        {
+            "name": "groups",
+            "description": "Endpoints for managing host groups."
+        },
+        {
+            "name": "budgets",
+            "description": "Endpoints for managing daily time budgets of hosts and groups."
+        },
+        {
+            "name": "debug",
+            "description": "Endpoints for inspecting captured slow and profiled requests (enabled with PROFILING_ENABLED)."
+        },
     ]
 )
 
@@ -28,7 +74,19 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+app.add_middleware(CompressionMiddleware)
+
 app.include_router(time.router)
+app.include_router(groups.router)
+app.include_router(budgets.router)
+
+if settings.PROFILING_ENABLED:
+    for engine in (async_engine, async_read_engine):
+        if engine is not None:
+            instrument_engine(engine)
+
+    app.add_middleware(ProfilingMiddleware)
+    app.include_router(profiles.router)
 
 @app.get("/", status_code=status.HTTP_200_OK)
 async def health_check() -> dict:
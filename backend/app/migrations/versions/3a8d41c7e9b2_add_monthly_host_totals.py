@@ -0,0 +1,46 @@
+"""Add monthly host totals
+
+Revision ID: 3a8d41c7e9b2
+Revises: 6f298a0a50d3
+Create Date: 2026-10-18 23:52:40.117305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a8d41c7e9b2'
+down_revision: Union[str, Sequence[str], None] = '6f298a0a50d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('monthly_host_totals',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('host_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('duration_seconds', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['host_id'], ['hosts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('host_id', 'month', name='uq_monthlyhosttotal_month')
+    )
+
+    # Backfill rollups from existing daily buckets
+    op.execute(
+        """
+        INSERT INTO monthly_host_totals (host_id, month, duration_seconds)
+        SELECT host_id, date_trunc('month', date)::date, sum(duration_seconds)
+        FROM daily_time_buckets
+        GROUP BY host_id, date_trunc('month', date)
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('monthly_host_totals')
@@ -0,0 +1,53 @@
+"""Add hourly UTC time buckets
+
+Revision ID: 6f298a0a50d3
+Revises: b0c0508f5195
+Create Date: 2026-10-18 23:30:12.482190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '6f298a0a50d3'
+down_revision: Union[str, Sequence[str], None] = 'b0c0508f5195'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('hourly_time_buckets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('host_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('hours', postgresql.ARRAY(sa.Integer(), dimensions=1), nullable=False),
+    sa.ForeignKeyConstraint(['host_id'], ['hosts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('host_id', 'date', name='uq_hourlytimebucket_utc')
+    )
+
+    # Backfill from daily buckets. Original hours are unknown, so each
+    # daily total goes into the 10:00 UTC slot of its date. Local time
+    # of that slot stays on the same date for offsets -10:00 to +13:00,
+    # which covers the widest populated range. Zones outside it still
+    # land on a neighbouring local day: UTC-11 and UTC-12 (Pacific/Pago_Pago,
+    # Pacific/Niue) one day earlier, UTC+14 (Pacific/Kiritimati) and the
+    # last quarter hour under Pacific/Chatham daylight time (+13:45) one
+    # day later
+    op.execute(
+        """
+        INSERT INTO hourly_time_buckets (host_id, date, hours)
+        SELECT host_id, date,
+               array_fill(0, ARRAY[10]) || duration_seconds || array_fill(0, ARRAY[13])
+        FROM daily_time_buckets
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('hourly_time_buckets')
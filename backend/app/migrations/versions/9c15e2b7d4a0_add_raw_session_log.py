@@ -0,0 +1,76 @@
+"""Add raw session log
+
+Revision ID: 9c15e2b7d4a0
+Revises: 3a8d41c7e9b2
+Create Date: 2026-10-19 01:12:05.604417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c15e2b7d4a0'
+down_revision: Union[str, Sequence[str], None] = '3a8d41c7e9b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('raw_session_batches',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('received_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('timezone', sa.String(length=64), nullable=False),
+    sa.Column('session_count', sa.Integer(), nullable=False),
+    sa.Column('first_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('last_end', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('payload', sa.LargeBinary(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_rawsessionbatch_first_start', 'raw_session_batches', ['first_start'], unique=False)
+    op.create_table('baseline_daily_time_buckets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('host_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('duration_seconds', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['host_id'], ['hosts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('host_id', 'date', name='uq_baselinedailytimebucket_local')
+    )
+    op.create_table('baseline_hourly_time_buckets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('host_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('hours', postgresql.ARRAY(sa.Integer(), dimensions=1), nullable=False),
+    sa.ForeignKeyConstraint(['host_id'], ['hosts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('host_id', 'date', name='uq_baselinehourlytimebucket_utc')
+    )
+
+    # Time flushed so far never reaches the log, rebuild starts from
+    # this snapshot. Monthly rollups are sums of daily rows, so they
+    # are re-derived instead of snapshotted
+    op.execute(
+        """
+        INSERT INTO baseline_daily_time_buckets (host_id, date, duration_seconds)
+        SELECT host_id, date, duration_seconds FROM daily_time_buckets
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO baseline_hourly_time_buckets (host_id, date, hours)
+        SELECT host_id, date, hours FROM hourly_time_buckets
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('baseline_hourly_time_buckets')
+    op.drop_table('baseline_daily_time_buckets')
+    op.drop_index('ix_rawsessionbatch_first_start', table_name='raw_session_batches')
+    op.drop_table('raw_session_batches')
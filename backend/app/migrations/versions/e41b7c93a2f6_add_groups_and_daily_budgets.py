@@ -0,0 +1,60 @@
+"""Add groups and daily budgets
+
+Revision ID: e41b7c93a2f6
+Revises: 9c15e2b7d4a0
+Create Date: 2026-10-19 02:03:51.270918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e41b7c93a2f6'
+down_revision: Union[str, Sequence[str], None] = '9c15e2b7d4a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('groups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.add_column('hosts', sa.Column('group_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('hosts_group_id_fkey', 'hosts', 'groups', ['group_id'], ['id'], ondelete='SET NULL')
+    op.create_table('daily_budgets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('host_id', sa.Integer(), nullable=True),
+    sa.Column('group_id', sa.Integer(), nullable=True),
+    sa.Column('limit_seconds', sa.Integer(), nullable=False),
+    sa.CheckConstraint('(host_id IS NULL) <> (group_id IS NULL)', name='ck_dailybudget_single_target'),
+    sa.ForeignKeyConstraint(['group_id'], ['groups.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['host_id'], ['hosts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('group_id'),
+    sa.UniqueConstraint('host_id')
+    )
+    op.create_table('budget_usage',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('budget_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('used_seconds', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['budget_id'], ['daily_budgets.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('budget_id', 'date', name='uq_budgetusage_date')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('budget_usage')
+    op.drop_table('daily_budgets')
+    op.drop_constraint('hosts_group_id_fkey', 'hosts', type_='foreignkey')
+    op.drop_column('hosts', 'group_id')
+    op.drop_table('groups')
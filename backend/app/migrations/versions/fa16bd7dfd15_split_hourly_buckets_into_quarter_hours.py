@@ -0,0 +1,62 @@
+"""Split hourly buckets into quarter hours
+
+Revision ID: fa16bd7dfd15
+Revises: e41b7c93a2f6
+Create Date: 2026-10-19 04:12:37.905316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fa16bd7dfd15'
+down_revision: Union[str, Sequence[str], None] = 'e41b7c93a2f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The baseline table is missing where 9c15e2b7d4a0 ran before it
+# took the baseline snapshot
+TABLES = ('hourly_time_buckets', 'baseline_hourly_time_buckets')
+
+
+def existing_tables() -> list[str]:
+    inspector = sa.inspect(op.get_bind())
+    return [table for table in TABLES if inspector.has_table(table)]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in existing_tables():
+        op.alter_column(table, 'hours', new_column_name='slots')
+
+        # Minutes within stored hours are unknown, so each hour is spread
+        # evenly over its four quarters, remainder seconds going first.
+        # Time flushed from now on is exact for every current UTC offset
+        op.execute(
+            f"""
+            UPDATE {table} SET slots = ARRAY(
+                SELECT slots[i / 4 + 1] / 4 + CASE WHEN i % 4 < slots[i / 4 + 1] % 4 THEN 1 ELSE 0 END
+                FROM generate_series(0, 95) AS i
+                ORDER BY i
+            )
+            """
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in existing_tables():
+        op.execute(
+            f"""
+            UPDATE {table} SET slots = ARRAY(
+                SELECT slots[4 * h + 1] + slots[4 * h + 2] + slots[4 * h + 3] + slots[4 * h + 4]
+                FROM generate_series(0, 23) AS h
+                ORDER BY h
+            )
+            """
+        )
+
+        op.alter_column(table, 'slots', new_column_name='hours')
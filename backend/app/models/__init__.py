@@ -1,5 +1,12 @@
 from .hosts import Host
 from .daily_time_buckets import DailyTimeBucket
+from .hourly_time_buckets import HourlyTimeBucket
+from .monthly_host_totals import MonthlyHostTotal
+from .raw_session_batches import RawSessionBatch
+from .bucket_baselines import DailyBucketBaseline, HourlyBucketBaseline
+from .groups import Group
+from .budgets import DailyBudget, BudgetUsage
 
 
-__all__ = ["Host", "DailyTimeBucket"]
\ No newline at end of file
+__all__ = ["Host", "DailyTimeBucket", "HourlyTimeBucket", "MonthlyHostTotal", "RawSessionBatch",
+           "DailyBucketBaseline", "HourlyBucketBaseline", "Group", "DailyBudget", "BudgetUsage"]
\ No newline at end of file
@@ -0,0 +1,48 @@
+import datetime
+from sqlalchemy import Integer, ForeignKey, Date, UniqueConstraint
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+# Snapshot of buckets as they were when the raw session log began.
+# Time flushed earlier is not in the log, so rebuild adds the log
+# on top of these rows instead of carrying live rows over
+
+
+class DailyBucketBaseline(Base):
+    __tablename__ = "baseline_daily_time_buckets"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    host_id: Mapped[int] = mapped_column(Integer, ForeignKey("hosts.id", ondelete="CASCADE"), nullable=False)
+
+    date: Mapped[datetime.date] = mapped_column(Date, nullable=False)
+    duration_seconds: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "host_id",
+            "date",
+            name="uq_baselinedailytimebucket_local"
+        ),
+    )
+
+
+class HourlyBucketBaseline(Base):
+    __tablename__ = "baseline_hourly_time_buckets"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    host_id: Mapped[int] = mapped_column(Integer, ForeignKey("hosts.id", ondelete="CASCADE"), nullable=False)
+
+    # Same layout as HourlyTimeBucket.slots
+    date: Mapped[datetime.date] = mapped_column(Date, nullable=False)
+    slots: Mapped[list[int]] = mapped_column(ARRAY(Integer, dimensions=1), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "host_id",
+            "date",
+            name="uq_baselinehourlytimebucket_utc"
+        ),
+    )
@@ -0,0 +1,49 @@
+import datetime
+from sqlalchemy import Integer, BigInteger, ForeignKey, Date, UniqueConstraint, CheckConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.database import Base
+
+
+class DailyBudget(Base):
+    __tablename__ = "daily_budgets"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    # Exactly one target: a single host or a whole group
+    host_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("hosts.id", ondelete="CASCADE"), unique=True, nullable=True)
+    group_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("groups.id", ondelete="CASCADE"), unique=True, nullable=True)
+
+    limit_seconds: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    host: Mapped["Host | None"] = relationship("Host") # type: ignore
+    group: Mapped["Group | None"] = relationship("Group") # type: ignore
+    usage: Mapped[list["BudgetUsage"]] = relationship("BudgetUsage", back_populates="budget",
+                                                      cascade="all, delete-orphan")
+
+    __table_args__ = (
+        CheckConstraint(
+            "(host_id IS NULL) <> (group_id IS NULL)",
+            name="ck_dailybudget_single_target"
+        ),
+    )
+
+
+class BudgetUsage(Base):
+    __tablename__ = "budget_usage"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    budget_id: Mapped[int] = mapped_column(Integer, ForeignKey("daily_budgets.id", ondelete="CASCADE"), nullable=False)
+
+    date: Mapped[datetime.date] = mapped_column(Date, nullable=False)
+    used_seconds: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+
+    budget: Mapped["DailyBudget"] = relationship("DailyBudget", back_populates="usage")
+
+    __table_args__ = (
+        UniqueConstraint(
+            "budget_id",
+            "date",
+            name="uq_budgetusage_date"
+        ),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String, Boolean
+from sqlalchemy import Integer, String, Boolean, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -9,6 +9,13 @@ class Host(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(256), unique=True, nullable=False)
+    group_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("groups.id", ondelete="SET NULL"), nullable=True)
+
+    group: Mapped["Group | None"] = relationship("Group", back_populates="hosts") # type: ignore
 
     daily_time_buckets: Mapped[list["DailyTimeBucket"]] = relationship("DailyTimeBucket", # type: ignore
+                                                            back_populates="host", cascade="all, delete-orphan")
+    hourly_time_buckets: Mapped[list["HourlyTimeBucket"]] = relationship("HourlyTimeBucket", # type: ignore
+                                                            back_populates="host", cascade="all, delete-orphan")
+    monthly_host_totals: Mapped[list["MonthlyHostTotal"]] = relationship("MonthlyHostTotal", # type: ignore
                                                             back_populates="host", cascade="all, delete-orphan")
\ No newline at end of file
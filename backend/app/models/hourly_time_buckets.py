@@ -0,0 +1,30 @@
+import datetime
+from sqlalchemy import Integer, ForeignKey, Date, UniqueConstraint
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.database import Base
+
+
+HOURS_PER_DAY = 24
+
+
+class HourlyTimeBucket(Base):
+    __tablename__ = "hourly_time_buckets"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    host_id: Mapped[int] = mapped_column(Integer, ForeignKey("hosts.id", ondelete="CASCADE"), nullable=False)
+
+    # UTC date with 96 quarter-hour slots (slots[1] = 00:00-00:15 UTC)
+    date: Mapped[datetime.date] = mapped_column(Date, nullable=False)
+    slots: Mapped[list[int]] = mapped_column(ARRAY(Integer, dimensions=1), nullable=False)
+
+    host: Mapped["Host"] = relationship("Host", back_populates="hourly_time_buckets") # type: ignore
+
+    __table_args__ = (
+        UniqueConstraint(
+            "host_id",
+            "date",
+            name="uq_hourlytimebucket_utc"
+        ),
+    )
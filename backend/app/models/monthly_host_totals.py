@@ -0,0 +1,26 @@
+import datetime
+from sqlalchemy import Integer, BigInteger, ForeignKey, Date, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.database import Base
+
+
+class MonthlyHostTotal(Base):
+    __tablename__ = "monthly_host_totals"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    host_id: Mapped[int] = mapped_column(Integer, ForeignKey("hosts.id", ondelete="CASCADE"), nullable=False)
+
+    # First day of the local calendar month
+    month: Mapped[datetime.date] = mapped_column(Date, nullable=False)
+    duration_seconds: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+
+    host: Mapped["Host"] = relationship("Host", back_populates="monthly_host_totals") # type: ignore
+
+    __table_args__ = (
+        UniqueConstraint(
+            "host_id",
+            "month",
+            name="uq_monthlyhosttotal_month"
+        ),
+    )
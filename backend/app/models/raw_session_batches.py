@@ -0,0 +1,25 @@
+import datetime
+from sqlalchemy import BigInteger, Integer, String, DateTime, LargeBinary, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class RawSessionBatch(Base):
+    __tablename__ = "raw_session_batches"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    received_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # Client timezone the sessions were split with
+    timezone: Mapped[str] = mapped_column(String(64), nullable=False)
+    session_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    first_start: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_end: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    # Accepted sessions encoded by app.session_log
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+    __table_args__ = (
+        Index("ix_rawsessionbatch_first_start", "first_start"),
+    )
@@ -0,0 +1,179 @@
+import asyncio
+import random
+import time
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+from app.schemas import ProfileCapture
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:
+    Profiler = None
+
+
+PROFILE_HEADER = "x-profile"
+
+
+@dataclass
+class RequestStats:
+    """
+    SQL statistics collected for one request
+    """
+    sql_count: int = 0
+    sql_time: float = 0.0
+    _started: list[float] = field(default_factory=list, repr=False)
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+_captures: deque[ProfileCapture] = deque(maxlen=settings.PROFILE_MAX_CAPTURES)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Counts statements and DB time for the request in context
+    """
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _request_stats.get()
+        if stats is not None:
+            stats._started.append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _request_stats.get()
+        if stats is not None and stats._started:
+            stats.sql_count += 1
+            stats.sql_time += time.perf_counter() - stats._started.pop()
+
+def should_profile(headers: dict[bytes, bytes]) -> bool:
+    """
+    Profiles when requested by header or picked by sampling
+    """
+    if Profiler is None:
+        return False
+    if headers.get(PROFILE_HEADER.encode()) in (b"1", b"true"):
+        return True
+    return random.random() < settings.PROFILE_SAMPLE_RATE
+
+def capture_dir() -> Path:
+    path = Path(settings.PROFILE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+def write_artifacts(capture_id: str, profiler) -> None:
+    """
+    Renders profile artifacts to disk. Blocking, runs in a worker thread
+    """
+    paths = artifact_paths(capture_id)
+    capture_dir()
+    paths["html"].write_text(profiler.output_html())
+    paths["speedscope"].write_text(profiler.output(renderer=SpeedscopeRenderer()))
+
+def remove_artifacts(capture_id: str) -> None:
+    for artifact in artifact_paths(capture_id).values():
+        artifact.unlink(missing_ok=True)
+
+async def save_capture(capture: ProfileCapture, profiler=None) -> None:
+    """
+    Stores capture metadata and profile artifacts, rendering and
+    file I/O are kept off the event loop
+    """
+    if profiler is not None:
+        await asyncio.to_thread(write_artifacts, capture.id, profiler)
+
+    # Evicted capture artifacts are removed from disk
+    evicted = _captures[0] if len(_captures) == _captures.maxlen else None
+    _captures.append(capture)
+
+    if evicted is not None:
+        await asyncio.to_thread(remove_artifacts, evicted.id)
+
+def artifact_paths(capture_id: str) -> dict[str, Path]:
+    path = Path(settings.PROFILE_DIR)
+    return {
+        "html": path / f"{capture_id}.html",
+        "speedscope": path / f"{capture_id}.speedscope.json",
+    }
+
+def list_captures() -> list[ProfileCapture]:
+    return list(reversed(_captures))
+
+def get_capture(capture_id: str) -> ProfileCapture | None:
+    return next((capture for capture in _captures if capture.id == capture_id), None)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that tracks SQL statistics per request,
+    runs a statistical profiler on opted-in requests and
+    captures requests slower than the configured threshold,
+    with profile artifacts when the request was profiled
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+
+        profiler = None
+        if should_profile(dict(scope["headers"])):
+            profiler = Profiler(async_mode="enabled")
+            profiler.start()
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+                # Report DB time to profiled clients
+                if profiler is not None:
+                    server_timing = f'db;dur={stats.sql_time * 1000:.1f};desc="{stats.sql_count} queries"'
+                    message.setdefault("headers", []).append(
+                        (b"server-timing", server_timing.encode())
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            if profiler is not None:
+                profiler.stop()
+            _request_stats.reset(token)
+
+            # Only slow requests are kept, profiled or not
+            if duration_ms >= settings.SLOW_REQUEST_THRESHOLD_MS:
+                await save_capture(
+                    ProfileCapture(
+                        id=uuid.uuid4().hex,
+                        captured_at=datetime.now(timezone.utc).isoformat(),
+                        method=scope["method"],
+                        path=scope["path"],
+                        status_code=status_code,
+                        duration_ms=round(duration_ms, 1),
+                        sql_count=stats.sql_count,
+                        sql_time_ms=round(stats.sql_time * 1000, 1),
+                        profiled=profiler is not None
+                    ),
+                    profiler
+                )
@@ -0,0 +1,377 @@
+"""
+Rebuilds time buckets and rollups from the raw session log.
+
+The log is split into date ranges by batch start, each range is decoded
+and re-split in a worker process, and the merged result is bulk loaded
+into shadow tables. Live tables are then swapped for the shadow tables
+in a single transaction, after applying batches logged meanwhile.
+
+Time flushed before the log existed is not in it. Migration
+9c15e2b7d4a0 snapshots the buckets of that time into baseline tables
+when it creates the log, and the rebuilt buckets are the baseline plus
+the re-derived log. Databases migrated before the snapshot existed
+have no baseline and are refused. Months compacted by retention are
+carried over from live tables.
+
+Usage: python -m app.rebuild [--workers N] [--chunk-days D]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from sqlalchemy import select, text, func, insert, table, column, Integer, Date, BigInteger
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.database import async_engine, async_session_maker
+from app.flush_batch import BucketIncrements
+from app.models.bucket_baselines import (
+    DailyBucketBaseline as DailyBucketBaselineModel,
+    HourlyBucketBaseline as HourlyBucketBaselineModel
+)
+from app.models.hosts import Host as HostModel
+from app.models.raw_session_batches import RawSessionBatch as RawSessionBatchModel
+from app.routers.time import apply_bucket_increments, compaction_cutoff
+from app.session_log import decode_sessions
+from app.time_splitting import month_start
+
+
+logger = logging.getLogger(__name__)
+
+SHADOW_SUFFIX = "_shadow"
+INSERT_BATCH_SIZE = 10000
+
+# Rebuilt tables: name -> (columns, unique key columns, unique constraint name)
+BUCKET_TABLES = {
+    "daily_time_buckets": (
+        [column("host_id", Integer), column("date", Date), column("duration_seconds", Integer)],
+        ("host_id", "date"),
+        "uq_dailytimebucket_local"
+    ),
+    "hourly_time_buckets": (
+        [column("host_id", Integer), column("date", Date), column("slots", ARRAY(Integer))],
+        ("host_id", "date"),
+        "uq_hourlytimebucket_utc"
+    ),
+    "monthly_host_totals": (
+        [column("host_id", Integer), column("month", Date), column("duration_seconds", BigInteger)],
+        ("host_id", "month"),
+        "uq_monthlyhosttotal_month"
+    ),
+}
+
+
+def derive_increments(rows: list[tuple[str, bytes]]) -> BucketIncrements:
+    """
+    Decodes logged batches and splits their sessions into
+    bucket increments keyed by host ID. Runs in a worker process
+    """
+    increments = BucketIncrements()
+    for timezone, payload in rows:
+        for host_id, _, start, end in decode_sessions(payload):
+            increments.add_session(host_id, start, end, timezone)
+    return increments
+
+def drop_unknown_hosts(increments: BucketIncrements, host_ids: set[int]) -> None:
+    """
+    Removes increments of hosts deleted since they were logged
+    """
+    for buckets in (increments.daily, increments.hourly, increments.monthly):
+        for key in [key for key in buckets if key[0] not in host_ids]:
+            del buckets[key]
+
+def drop_carried(increments: BucketIncrements, carry_date: date) -> None:
+    """
+    Removes increments of days carried over from live tables.
+    Monthly increments are re-derived from the remaining daily ones,
+    since a month may straddle carry_date
+    """
+    for buckets in (increments.daily, increments.hourly):
+        for key in [key for key in buckets if key[1] < carry_date]:
+            del buckets[key]
+
+    increments.monthly = {}
+    for (host, local_date), seconds in increments.daily.items():
+        month_key = (host, month_start(local_date))
+        increments.monthly[month_key] = increments.monthly.get(month_key, 0) + seconds
+
+async def baseline_exists(conn: AsyncConnection) -> bool:
+    return await conn.scalar(
+        text("SELECT to_regclass(:name) IS NOT NULL"),
+        {"name": DailyBucketBaselineModel.__tablename__}
+    )
+
+async def load_baseline(conn: AsyncConnection) -> BucketIncrements:
+    """
+    Loads buckets of time flushed before the log began as increments
+    keyed by host ID, with monthly rollups derived from daily rows
+    """
+    baseline = BucketIncrements()
+
+    result = await conn.execute(
+        select(
+            DailyBucketBaselineModel.host_id,
+            DailyBucketBaselineModel.date,
+            DailyBucketBaselineModel.duration_seconds
+        )
+    )
+    for host_id, local_date, seconds in result.all():
+        baseline.daily[(host_id, local_date)] = seconds
+        month_key = (host_id, month_start(local_date))
+        baseline.monthly[month_key] = baseline.monthly.get(month_key, 0) + seconds
+
+    result = await conn.execute(
+        select(HourlyBucketBaselineModel.host_id, HourlyBucketBaselineModel.date, HourlyBucketBaselineModel.slots)
+    )
+    for host_id, utc_date, slots in result.all():
+        baseline.hourly[(host_id, utc_date)] = list(slots)
+
+    return baseline
+
+async def plan_chunks(
+    conn: AsyncConnection,
+    last_id: int,
+    chunk_days: int
+) -> list[tuple[datetime, datetime]]:
+    """
+    Splits logged batches up to last_id into half-open date ranges
+    """
+    first, last = (await conn.execute(
+        select(
+            func.min(RawSessionBatchModel.first_start),
+            func.max(RawSessionBatchModel.first_start)
+        )
+        .where(RawSessionBatchModel.id <= last_id)
+    )).one()
+
+    chunks = []
+    current = first
+    while current is not None and current <= last:
+        chunks.append((current, current + timedelta(days=chunk_days)))
+        current += timedelta(days=chunk_days)
+
+    return chunks
+
+async def derive_chunk(
+    pool: Executor,
+    semaphore: asyncio.Semaphore,
+    last_id: int,
+    chunk_start: datetime,
+    chunk_end: datetime
+) -> BucketIncrements:
+    """
+    Loads one date range of the log and derives its increments in the pool
+    """
+    async with semaphore:
+        async with async_engine.connect() as conn:
+            result = await conn.execute(
+                select(RawSessionBatchModel.timezone, RawSessionBatchModel.payload)
+                .where(
+                    RawSessionBatchModel.id <= last_id,
+                    RawSessionBatchModel.first_start >= chunk_start,
+                    RawSessionBatchModel.first_start < chunk_end
+                )
+            )
+            rows = [tuple(row) for row in result.all()]
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, derive_increments, rows)
+
+async def create_shadow_tables(conn: AsyncConnection) -> None:
+    """
+    Creates empty shadow tables. Constraints are added after loading
+    """
+    for name in BUCKET_TABLES:
+        await conn.execute(text(f"DROP TABLE IF EXISTS {name}{SHADOW_SUFFIX}"))
+        await conn.execute(text(f"CREATE TABLE {name}{SHADOW_SUFFIX} (LIKE {name} INCLUDING DEFAULTS)"))
+
+async def load_shadow_tables(conn: AsyncConnection, increments: BucketIncrements) -> None:
+    """
+    Bulk inserts increments into shadow tables and adds constraints
+    """
+    rows_by_table = {
+        "daily_time_buckets": [
+            {"host_id": host_id, "date": day, "duration_seconds": seconds}
+            for (host_id, day), seconds in increments.daily.items()
+        ],
+        "hourly_time_buckets": [
+            {"host_id": host_id, "date": day, "slots": slots}
+            for (host_id, day), slots in increments.hourly.items()
+        ],
+        "monthly_host_totals": [
+            {"host_id": host_id, "month": month, "duration_seconds": seconds}
+            for (host_id, month), seconds in increments.monthly.items()
+        ],
+    }
+
+    for name, (columns, unique_columns, unique_name) in BUCKET_TABLES.items():
+        shadow = table(f"{name}{SHADOW_SUFFIX}", *columns)
+        rows = rows_by_table[name]
+
+        for offset in range(0, len(rows), INSERT_BATCH_SIZE):
+            await conn.execute(insert(shadow), rows[offset:offset + INSERT_BATCH_SIZE])
+
+        # Building indexes after the load is cheaper than maintaining them
+        await conn.execute(text(
+            f"ALTER TABLE {name}{SHADOW_SUFFIX} ADD CONSTRAINT {name}{SHADOW_SUFFIX}_pkey PRIMARY KEY (id)"
+        ))
+        await conn.execute(text(
+            f"ALTER TABLE {name}{SHADOW_SUFFIX} ADD CONSTRAINT {unique_name}{SHADOW_SUFFIX} "
+            f"UNIQUE ({', '.join(unique_columns)})"
+        ))
+        await conn.execute(text(
+            f"ALTER TABLE {name}{SHADOW_SUFFIX} ADD CONSTRAINT {name}{SHADOW_SUFFIX}_host_id_fkey "
+            f"FOREIGN KEY (host_id) REFERENCES hosts (id) ON DELETE CASCADE"
+        ))
+
+async def carry_live_rows(db: AsyncSession, carry_date: date) -> None:
+    """
+    Copies rows of days before carry_date from live tables into shadow
+    tables. The month containing carry_date gets its carried part
+    summed from live daily rows on top of the rebuilt part
+    """
+    params = {"carry_date": carry_date, "carry_month": month_start(carry_date)}
+
+    await db.execute(text(
+        f"INSERT INTO daily_time_buckets{SHADOW_SUFFIX} (host_id, date, duration_seconds) "
+        f"SELECT host_id, date, duration_seconds FROM daily_time_buckets WHERE date < :carry_date"
+    ), params)
+    await db.execute(text(
+        f"INSERT INTO hourly_time_buckets{SHADOW_SUFFIX} (host_id, date, slots) "
+        f"SELECT host_id, date, slots FROM hourly_time_buckets WHERE date < :carry_date"
+    ), params)
+    await db.execute(text(
+        f"INSERT INTO monthly_host_totals{SHADOW_SUFFIX} (host_id, month, duration_seconds) "
+        f"SELECT host_id, month, duration_seconds FROM monthly_host_totals WHERE month < :carry_month"
+    ), params)
+    await db.execute(text(
+        f"INSERT INTO monthly_host_totals{SHADOW_SUFFIX} AS shadow (host_id, month, duration_seconds) "
+        f"SELECT host_id, :carry_month, SUM(duration_seconds) FROM daily_time_buckets "
+        f"WHERE date >= :carry_month AND date < :carry_date GROUP BY host_id "
+        f"ON CONFLICT (host_id, month) "
+        f"DO UPDATE SET duration_seconds = shadow.duration_seconds + EXCLUDED.duration_seconds"
+    ), params)
+
+async def swap_shadow_tables(last_id: int, carry_date: date | None) -> int:
+    """
+    Atomically replaces live tables with shadow tables. Days before
+    carry_date, if any, are carried over and batches logged after
+    last_id are applied to the new tables inside the same transaction.
+    Returns number of caught-up batches
+    """
+    async with async_session_maker() as db:
+        # Blocks flushes until the swap commits
+        for name in BUCKET_TABLES:
+            await db.execute(text(f"LOCK TABLE {name} IN ACCESS EXCLUSIVE MODE"))
+
+        # Carried under the lock, so no flush lands between copy and swap
+        if carry_date is not None:
+            await carry_live_rows(db, carry_date)
+
+        result = await db.execute(
+            select(RawSessionBatchModel.timezone, RawSessionBatchModel.payload)
+            .where(RawSessionBatchModel.id > last_id)
+        )
+        catch_up_rows = [tuple(row) for row in result.all()]
+
+        for name, (_, _, unique_name) in BUCKET_TABLES.items():
+            sequence = await db.scalar(text(f"SELECT pg_get_serial_sequence('{name}', 'id')"))
+            if sequence is not None:
+                await db.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {name}{SHADOW_SUFFIX}.id"))
+
+            await db.execute(text(f"DROP TABLE {name}"))
+            await db.execute(text(f"ALTER TABLE {name}{SHADOW_SUFFIX} RENAME TO {name}"))
+
+            for old, new in (
+                (f"{name}{SHADOW_SUFFIX}_pkey", f"{name}_pkey"),
+                (f"{unique_name}{SHADOW_SUFFIX}", unique_name),
+                (f"{name}{SHADOW_SUFFIX}_host_id_fkey", f"{name}_host_id_fkey"),
+            ):
+                await db.execute(text(f"ALTER TABLE {name} RENAME CONSTRAINT {old} TO {new}"))
+
+        # Tables now carry live names, so regular upserts apply
+        catch_up = derive_increments(catch_up_rows)
+        drop_unknown_hosts(catch_up, set((await db.scalars(select(HostModel.id))).all()))
+        # Time of carried days is already in the carried live rows
+        if carry_date is not None:
+            drop_carried(catch_up, carry_date)
+        await apply_bucket_increments(db, catch_up)
+
+        await db.commit()
+
+    return len(catch_up_rows)
+
+async def rebuild_buckets(workers: int, chunk_days: int) -> bool:
+    """
+    Rebuilds buckets from the baseline and the log.
+    Returns False when the rebuild was refused
+    """
+    started = time.perf_counter()
+
+    async with async_engine.connect() as conn:
+        has_baseline = await baseline_exists(conn)
+
+    if not has_baseline:
+        logger.error(
+            "Baseline tables are missing, this database was migrated before they existed. "
+            "Rebuilding would drop all time flushed before the log began"
+        )
+        await async_engine.dispose()
+        return False
+
+    async with async_engine.connect() as conn:
+        last_id = await conn.scalar(select(func.max(RawSessionBatchModel.id))) or 0
+        chunks = await plan_chunks(conn, last_id, chunk_days)
+        host_ids = set((await conn.scalars(select(HostModel.id))).all())
+        baseline = await load_baseline(conn)
+
+    # Compacted months have no daily rows left to rebuild
+    carry_date = compaction_cutoff()
+
+    logger.info(
+        "Rebuilding from baseline and %d log batches in %d chunks, days before %s carried over",
+        last_id, len(chunks), carry_date
+    )
+
+    # Derive increments for every date range in parallel
+    semaphore = asyncio.Semaphore(workers * 2)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = await asyncio.gather(*[
+            derive_chunk(pool, semaphore, last_id, chunk_start, chunk_end)
+            for chunk_start, chunk_end in chunks
+        ])
+
+    increments = baseline
+    for result in results:
+        increments.merge(result)
+    drop_unknown_hosts(increments, host_ids)
+    if carry_date is not None:
+        drop_carried(increments, carry_date)
+
+    async with async_engine.begin() as conn:
+        await create_shadow_tables(conn)
+        await load_shadow_tables(conn, increments)
+
+    caught_up = await swap_shadow_tables(last_id, carry_date)
+
+    logger.info(
+        "Rebuild finished in %.1fs (%d daily, %d hourly, %d monthly rows, %d batches caught up)",
+        time.perf_counter() - started,
+        len(increments.daily), len(increments.hourly), len(increments.monthly), caught_up
+    )
+
+    await async_engine.dispose()
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild time buckets from the raw session log")
+    parser.add_argument("--workers", type=int, default=4, help="Number of worker processes")
+    parser.add_argument("--chunk-days", type=int, default=7, help="Days of log per work chunk")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(0 if asyncio.run(rebuild_buckets(args.workers, args.chunk_days)) else 1)
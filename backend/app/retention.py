@@ -0,0 +1,154 @@
+import asyncio
+import logging
+from datetime import date, datetime, timezone, timedelta
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session_maker
+from app.models.daily_time_buckets import DailyTimeBucket as DailyTimeBucketModel
+from app.models.hourly_time_buckets import HourlyTimeBucket as HourlyTimeBucketModel
+from app.models.monthly_host_totals import MonthlyHostTotal as MonthlyHostTotalModel
+from app.models.raw_session_batches import RawSessionBatch as RawSessionBatchModel
+from app.models.bucket_baselines import (
+    DailyBucketBaseline as DailyBucketBaselineModel,
+    HourlyBucketBaseline as HourlyBucketBaselineModel
+)
+from app.routers.time import upsert_monthly_totals, resolve_host_ids, compaction_cutoff, OTHER_HOST_NAME
+from app.time_splitting import month_start
+
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock serializing long-tail merges across app workers
+COMPACTION_LOCK_KEY = 0x6275726e
+
+
+async def get_other_host_id(db: AsyncSession) -> int:
+    host_ids = await resolve_host_ids(db, {OTHER_HOST_NAME})
+    return host_ids[OTHER_HOST_NAME]
+
+async def next_month_to_compact(db: AsyncSession, cutoff: date) -> date | None:
+    """
+    Oldest month before cutoff that still has daily or hourly rows
+    """
+    oldest = await db.scalar(
+        select(func.least(
+            select(func.min(DailyTimeBucketModel.date))
+            .where(DailyTimeBucketModel.date < cutoff).scalar_subquery(),
+            select(func.min(HourlyTimeBucketModel.date))
+            .where(HourlyTimeBucketModel.date < cutoff).scalar_subquery()
+        ))
+    )
+    return month_start(oldest) if oldest is not None else None
+
+async def merge_long_tail(db: AsyncSession, month: date) -> int:
+    """
+    Folds monthly rows of hosts below the long-tail threshold into
+    the other host. Idempotent, so an interrupted run can be repeated.
+    Returns number of merged hosts
+    """
+    await db.execute(select(func.pg_advisory_xact_lock(COMPACTION_LOCK_KEY)))
+
+    other_host_id = await get_other_host_id(db)
+
+    tail_filter = (
+        (MonthlyHostTotalModel.month == month)
+        & (MonthlyHostTotalModel.host_id != other_host_id)
+        & (MonthlyHostTotalModel.duration_seconds < settings.RETENTION_TAIL_MAX_SECONDS)
+    )
+
+    tail_count, tail_seconds = (await db.execute(
+        select(func.count(), func.coalesce(func.sum(MonthlyHostTotalModel.duration_seconds), 0))
+        .where(tail_filter)
+    )).one()
+
+    if tail_count:
+        await upsert_monthly_totals(db, other_host_id, month, tail_seconds)
+        await db.execute(delete(MonthlyHostTotalModel).where(tail_filter))
+
+    await db.commit()
+    return tail_count
+
+async def delete_in_batches(model, filter_clause) -> int:
+    """
+    Deletes matching rows in short transactions of limited size
+    """
+    deleted = 0
+    while True:
+        async with async_session_maker() as db:
+            batch_ids = select(model.id).where(filter_clause).limit(settings.COMPACTION_BATCH_SIZE)
+            result = await db.execute(delete(model).where(model.id.in_(batch_ids.scalar_subquery())))
+            await db.commit()
+
+        deleted += result.rowcount
+        if result.rowcount < settings.COMPACTION_BATCH_SIZE:
+            return deleted
+
+        # Yield to regular traffic between batches
+        await asyncio.sleep(settings.COMPACTION_BATCH_PAUSE_SECONDS)
+
+async def compact_month(month: date) -> None:
+    """
+    Compacts one month: long-tail hosts are merged in monthly rollups,
+    then daily and hourly rows of the month are dropped. Monthly rollups
+    already hold the per-host totals of those rows
+    """
+    next_month = (month + timedelta(days=32)).replace(day=1)
+
+    async with async_session_maker() as db:
+        merged = await merge_long_tail(db, month)
+
+    daily = await delete_in_batches(
+        DailyTimeBucketModel,
+        DailyTimeBucketModel.date.between(month, next_month - timedelta(days=1))
+    )
+    hourly = await delete_in_batches(
+        HourlyTimeBucketModel,
+        HourlyTimeBucketModel.date.between(month, next_month - timedelta(days=1))
+    )
+
+    logger.info(
+        "Compacted %s: %d daily and %d hourly rows removed, %d hosts merged",
+        month.strftime("%Y-%m"), daily, hourly, merged
+    )
+
+async def run_compaction_pass() -> None:
+    """
+    Compacts every month older than the retention cutoff, oldest first.
+    Progress lives in the data itself, so a pass resumes where the
+    previous one stopped
+    """
+    cutoff = compaction_cutoff()
+    if cutoff is None:
+        return
+
+    while True:
+        async with async_session_maker() as db:
+            month = await next_month_to_compact(db, cutoff)
+        if month is None:
+            break
+
+        await compact_month(month)
+
+    # Raw sessions of compacted months can no longer be rebuilt into daily rows
+    await delete_in_batches(
+        RawSessionBatchModel,
+        RawSessionBatchModel.last_end < datetime(cutoff.year, cutoff.month, 1, tzinfo=timezone.utc)
+    )
+
+    # Nor can their baseline rows, rebuild carries compacted months over
+    await delete_in_batches(DailyBucketBaselineModel, DailyBucketBaselineModel.date < cutoff)
+    await delete_in_batches(HourlyBucketBaselineModel, HourlyBucketBaselineModel.date < cutoff)
+
+async def run_retention() -> None:
+    """
+    Background loop running compaction passes periodically
+    """
+    while True:
+        try:
+            await run_compaction_pass()
+        except Exception:
+            logger.exception("Compaction pass failed")
+
+        await asyncio.sleep(settings.COMPACTION_INTERVAL_SECONDS)
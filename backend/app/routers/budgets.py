@@ -0,0 +1,121 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from sqlalchemy import select, delete, func, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas import Budget, BudgetCreate, BudgetStatus
+from app.models.budgets import DailyBudget as DailyBudgetModel, BudgetUsage as BudgetUsageModel
+from app.models.daily_time_buckets import DailyTimeBucket as DailyTimeBucketModel
+from app.models.groups import Group as GroupModel
+from app.models.hosts import Host as HostModel
+from app.db_depends import get_async_db
+from app.budget_usage import build_budget_status
+from app.routers.time import resolve_host_ids, validate_timezone
+
+
+router = APIRouter(
+    prefix="/budgets",
+    tags=["budgets"]
+)
+
+@router.get("/", response_model=list[Budget], status_code=status.HTTP_200_OK)
+async def get_all_budgets(
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Returns a list of all daily budgets
+    """
+    result = await db.execute(
+        select(DailyBudgetModel.id, HostModel.name, DailyBudgetModel.group_id, DailyBudgetModel.limit_seconds)
+        .outerjoin(HostModel, DailyBudgetModel.host_id == HostModel.id)
+        .order_by(DailyBudgetModel.id)
+    )
+    return [
+        Budget(id=budget_id, host=host, group_id=group_id, limit_seconds=limit_seconds)
+        for budget_id, host, group_id, limit_seconds in result.all()
+    ]
+
+@router.get("/status", response_model=BudgetStatus, status_code=status.HTTP_200_OK)
+async def get_budget_status(
+    timezone: str = Query(..., description="IANA name for user timezone"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Returns budget usage for the current local day
+    and hosts whose budget is used up
+    """
+    validate_timezone(timezone)
+    return await build_budget_status(db, timezone)
+
+@router.post("/", response_model=Budget, status_code=status.HTTP_201_CREATED)
+async def create_budget(
+    payload: BudgetCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Sets a daily budget on a host or a group. Usage of the last
+    two days is seeded from daily buckets, later usage is
+    maintained by flushes
+    """
+    budget = DailyBudgetModel(limit_seconds=payload.limit_seconds)
+
+    if payload.host is not None:
+        host_ids = await resolve_host_ids(db, {payload.host})
+        budget.host_id = host_ids[payload.host]
+        seed_filter = DailyTimeBucketModel.host_id == budget.host_id
+    else:
+        if await db.get(GroupModel, payload.group_id) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Group not found"
+            )
+        budget.group_id = payload.group_id
+        seed_filter = DailyTimeBucketModel.host_id.in_(
+            select(HostModel.id).where(HostModel.group_id == payload.group_id)
+        )
+
+    db.add(budget)
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Budget already exists for this target"
+        )
+
+    # Local today is within one day of server date in every timezone
+    await db.execute(
+        insert(BudgetUsageModel).from_select(
+            ["budget_id", "date", "used_seconds"],
+            select(
+                literal(budget.id),
+                DailyTimeBucketModel.date,
+                func.sum(DailyTimeBucketModel.duration_seconds)
+            )
+            .where(seed_filter, DailyTimeBucketModel.date >= func.current_date() - 1)
+            .group_by(DailyTimeBucketModel.date)
+        )
+    )
+    await db.commit()
+
+    return Budget(id=budget.id, **payload.model_dump())
+
+@router.delete("/{budget_id}", status_code=status.HTTP_200_OK)
+async def delete_budget(
+    budget_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Deletes a daily budget with its usage
+    """
+    result = await db.execute(delete(DailyBudgetModel).where(DailyBudgetModel.id == budget_id))
+    if result.rowcount == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Budget not found"
+        )
+    await db.commit()
+
+    return {"message": f"Budget deleted with ID = {budget_id}"}
@@ -1,6 +1,13 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends
+from sqlalchemy import select, update, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.schemas import Group as GroupSchema, GroupCreate
+from app.models.groups import Group as GroupModel
+from app.models.hosts import Host as HostModel
+from app.db_depends import get_async_db
+from app.routers.time import resolve_host_ids
 
 
 router = APIRouter(
@@ -8,37 +15,134 @@ router = APIRouter(
     tags=["groups"]
 )
 
-@router.get("/", status_code=status.HTTP_200_OK)
-async def get_all_groups():
+async def get_group_or_404(db: AsyncSession, group_id: int) -> GroupModel:
+    group = await db.get(GroupModel, group_id)
+    if group is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Group not found"
+        )
+    return group
+
+async def build_group_schema(db: AsyncSession, group: GroupModel) -> GroupSchema:
+    hosts = await db.scalars(
+        select(HostModel.name)
+        .where(HostModel.group_id == group.id)
+        .order_by(HostModel.name)
+    )
+    return GroupSchema(id=group.id, name=group.name, hosts=list(hosts))
+
+async def assign_hosts(db: AsyncSession, group_id: int, host_names: list[str]) -> None:
+    """
+    Makes host_names the exact member list of a group,
+    creating hosts that were never tracked yet
+    """
+    host_ids = await resolve_host_ids(db, set(host_names))
+
+    await db.execute(
+        update(HostModel)
+        .where(HostModel.group_id == group_id, HostModel.id.not_in(host_ids.values()))
+        .values(group_id=None)
+    )
+    if host_ids:
+        await db.execute(
+            update(HostModel)
+            .where(HostModel.id.in_(host_ids.values()))
+            .values(group_id=group_id)
+        )
+
+async def flush_or_conflict(db: AsyncSession) -> None:
+    """
+    Flushes the group name before hosts are resolved, so a duplicate
+    name is not raised by autoflush inside resolve_host_ids
+    """
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Group name already exists"
+        )
+
+async def commit_or_conflict(db: AsyncSession) -> None:
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Group name already exists"
+        )
+
+@router.get("/", response_model=list[GroupSchema], status_code=status.HTTP_200_OK)
+async def get_all_groups(
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Returns a list of all groups in database
     """
-    return {"message": "Lists all known groups"}
+    groups = await db.scalars(select(GroupModel).order_by(GroupModel.id))
+    return [await build_group_schema(db, group) for group in groups.all()]
 
-@router.get("/{group_id}", status_code=status.HTTP_200_OK)
-async def get_group(group_id: int):
+@router.get("/{group_id}", response_model=GroupSchema, status_code=status.HTTP_200_OK)
+async def get_group(
+    group_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Returns a group with a specified ID from database
     """
-    return {"message": "Returns group with ID = " + group_id}
+    group = await get_group_or_404(db, group_id)
+    return await build_group_schema(db, group)
 
-@router.post("/", status_code=status.HTTP_201_CREATED)
-async def create_group():
+@router.post("/", response_model=GroupSchema, status_code=status.HTTP_201_CREATED)
+async def create_group(
+    payload: GroupCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Creates a new group to the database
     """
-    return {"message": "Adds a new group to the database"}
+    group = GroupModel(name=payload.name)
+    db.add(group)
+    await flush_or_conflict(db)
+
+    await assign_hosts(db, group.id, payload.hosts)
+    await commit_or_conflict(db)
+
+    return await build_group_schema(db, group)
 
-@router.put("/{group_id}", status_code=status.HTTP_200_OK)
-async def update_group(group_id: int):
+@router.put("/{group_id}", response_model=GroupSchema, status_code=status.HTTP_200_OK)
+async def update_group(
+    group_id: int,
+    payload: GroupCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Updates group data in the database
     """
-    return {"message": "Updates host with ID = " + group_id}
+    group = await get_group_or_404(db, group_id)
+    group.name = payload.name
+    await flush_or_conflict(db)
+
+    await assign_hosts(db, group.id, payload.hosts)
+    await commit_or_conflict(db)
+
+    return await build_group_schema(db, group)
 
 @router.delete("/{group_id}", status_code=status.HTTP_200_OK)
-async def delete_group(group_id: int):
+async def delete_group(
+    group_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Deletes group from the database
     """
-    return {"message": "Group deleted with ID = " + group_id}
\ No newline at end of file
+    await get_group_or_404(db, group_id)
+
+    # Member hosts are detached and group budgets removed by foreign keys
+    await db.execute(delete(GroupModel).where(GroupModel.id == group_id))
+    await db.commit()
+
+    return {"message": f"Group deleted with ID = {group_id}"}
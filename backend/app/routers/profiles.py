@@ -0,0 +1,45 @@
+from typing import Literal
+from fastapi import APIRouter, HTTPException, status, Query
+from fastapi.responses import FileResponse
+
+from app.schemas import ProfileCapture
+from app.profiling import list_captures, get_capture, artifact_paths
+
+
+router = APIRouter(
+    prefix="/debug/profiles",
+    tags=["debug"]
+)
+
+@router.get("/", response_model=list[ProfileCapture], status_code=status.HTTP_200_OK)
+async def get_all_captures():
+    """
+    Returns recent slow or profiled requests, newest first
+    """
+    return list_captures()
+
+@router.get("/{capture_id}", status_code=status.HTTP_200_OK)
+async def get_capture_artifact(
+    capture_id: str,
+    format: Literal["html", "speedscope"] = Query("html", description="Profile artifact format")
+):
+    """
+    Returns profile artifact of a captured request.
+    Speedscope JSON can be opened as a flame graph at speedscope.app
+    """
+    capture = get_capture(capture_id)
+    if capture is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Capture not found"
+        )
+    if not capture.profiled:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Capture has no profile, only metadata"
+        )
+
+    path = artifact_paths(capture_id)[format]
+    media_type = "text/html" if format == "html" else "application/json"
+
+    return FileResponse(path, media_type=media_type)
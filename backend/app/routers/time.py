@@ -1,15 +1,36 @@
-from fastapi import APIRouter, status, Depends, Query, HTTPException
-from sqlalchemy import select, delete, func
-from sqlalchemy.dialects.postgresql import insert
+import asyncio
+import random
+from fastapi import APIRouter, status, Depends, Query, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from sqlalchemy import select, func, union_all, or_, text
+from sqlalchemy.dialects.postgresql import insert, array
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, timedelta, timezone as dt_timezone
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from app.schemas import SessionList, Statistics, DailyStatistics, Graph, Heatmap, TopHosts, Host
+from app.schemas import (
+    SessionList, Statistics, DailyStatistics, Graph, Heatmap, TopHosts, Host,
+    HourlyHeatmap, CustomStatistics, BatchStatistics
+)
 from app.models.hosts import Host as HostModel
 from app.models.daily_time_buckets import DailyTimeBucket as DailyTimeBucketModel
-from app.db_depends import get_async_db
-from app.time_splitting import split_into_daily_buckets, PeriodType
+from app.models.hourly_time_buckets import HourlyTimeBucket as HourlyTimeBucketModel, HOURS_PER_DAY
+from app.models.monthly_host_totals import MonthlyHostTotal as MonthlyHostTotalModel
+from app.models.raw_session_batches import RawSessionBatch as RawSessionBatchModel
+from app.models.budgets import BudgetUsage as BudgetUsageModel
+from app.models.bucket_baselines import (
+    DailyBucketBaseline as DailyBucketBaselineModel,
+    HourlyBucketBaseline as HourlyBucketBaselineModel
+)
+from app.config import settings
+from app.db_depends import get_async_db, get_async_read_db, get_snapshot_time, is_transient_conflict
+from app.admission import acquire_flush_slot, suggest_next_sync_seconds, overloaded_error
+from app.stats_cache import stats_cache
+from app.budget_usage import apply_budget_usage, get_over_budget_hosts
+from app.flush_batch import run_prepare_flush_batch, FlushPayloadError, BucketIncrements, PreparedBatch
+from app.session_log import encode_sessions
+from app.time_splitting import localize_slot, split_range_by_months, month_start, PeriodType, SLOTS_PER_DAY
 
 
 router = APIRouter(
@@ -17,6 +38,28 @@ router = APIRouter(
     tags=["time"]
 )
 
+# Pseudo-host collecting long-tail hosts of compacted months.
+# Parentheses keep it from colliding with any real hostname
+OTHER_HOST_NAME = "(other)"
+
+# Widest stats window (year heatmap) in days
+STATS_HISTORY_DAYS = 365
+
+# Graph and heatmap window lengths for each period
+PERIOD_DAYS = {PeriodType.WEEK: 7, PeriodType.MONTH: 30, PeriodType.YEAR: 365}
+HEATMAP_DAYS = {PeriodType.WEEK: 30, PeriodType.MONTH: 365, PeriodType.YEAR: 365}
+
+def compaction_cutoff() -> date | None:
+    """
+    Returns first day of the oldest month that keeps daily rows,
+    or None when retention is disabled
+    """
+    if settings.RETENTION_DAILY_YEARS <= 0:
+        return None
+
+    current_month = month_start(datetime.now(dt_timezone.utc).date())
+    return current_month.replace(year=current_month.year - settings.RETENTION_DAILY_YEARS)
+
 async def upsert_time_buckets(
     db: AsyncSession,
     host_id: int,
@@ -44,6 +87,63 @@ async def upsert_time_buckets(
 
     await db.execute(upsert_stmt)
 
+async def upsert_hourly_buckets(
+    db: AsyncSession,
+    host_id: int,
+    date: date,
+    slots: list[int]
+) -> None:
+    """
+    Creates new hourly bucket row. If exists, increments each quarter-hour slot
+    """
+    stmt = insert(HourlyTimeBucketModel).values(
+        host_id=host_id,
+        date=date,
+        slots=slots
+    )
+
+    upsert_stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            HourlyTimeBucketModel.host_id,
+            HourlyTimeBucketModel.date,
+        ],
+        set_={
+            "slots": array([
+                HourlyTimeBucketModel.slots[slot + 1] + seconds
+                for slot, seconds in enumerate(slots)
+            ])
+        }
+    )
+
+    await db.execute(upsert_stmt)
+
+async def upsert_monthly_totals(
+    db: AsyncSession,
+    host_id: int,
+    month: date,
+    duration_seconds: int
+) -> None:
+    """
+    Creates new monthly host rollup. If exists, increments duration
+    """
+    stmt = insert(MonthlyHostTotalModel).values(
+        host_id=host_id,
+        month=month,
+        duration_seconds=duration_seconds
+    )
+
+    upsert_stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            MonthlyHostTotalModel.host_id,
+            MonthlyHostTotalModel.month,
+        ],
+        set_={
+            "duration_seconds": MonthlyHostTotalModel.duration_seconds + duration_seconds
+        }
+    )
+
+    await db.execute(upsert_stmt)
+
 def validate_timezone(tz) -> None:
     try:
         ZoneInfo(tz)
@@ -53,39 +153,106 @@ def validate_timezone(tz) -> None:
             detail="Invalid timezone"
         )
     
-async def build_date_totals_collection(
+async def fetch_slots(
     db: AsyncSession,
-    range_length: int,
     start: date,
     end: date
-) -> list[DailyStatistics]:
+) -> list[tuple[date, list[int]]]:
     """
-    Builds a list of all dates within a range
-    with total seconds for each
+    Returns quarter-hour slots summed across all hosts
+    for every UTC date within a range
     """
-    # Build date window
-    window_dates = [start + timedelta(days=i) for i in range(range_length)]
-    
-    # Query for time buckets grouped by date within range
     stmt = (
         select(
-            DailyTimeBucketModel.date,
-            func.sum(DailyTimeBucketModel.duration_seconds)
+            HourlyTimeBucketModel.date,
+            *[
+                func.sum(HourlyTimeBucketModel.slots[slot + 1])
+                for slot in range(SLOTS_PER_DAY)
+            ]
         )
-        .where(DailyTimeBucketModel.date.between(start, end))
-        .group_by(DailyTimeBucketModel.date)
-        .order_by(DailyTimeBucketModel.date)
+        .where(HourlyTimeBucketModel.date.between(start, end))
+        .group_by(HourlyTimeBucketModel.date)
+        .order_by(HourlyTimeBucketModel.date)
     )
     result = await db.execute(stmt)
-    rows = result.all()
 
-    # Convert to dict
-    daily_totals_db = {row[0]: row[1] for row in rows}
+    return [(row[0], [seconds or 0 for seconds in row[1:]]) for row in result.all()]
+
+async def load_local_date_totals(
+    db: AsyncSession,
+    start: date,
+    end: date,
+    timezone: str
+) -> dict[date, int]:
+    """
+    Returns total seconds for each local date within a range.
+    Local days are derived from UTC quarter-hour slots at query time
+    """
+    # Local dates may start up to a day before or after the UTC date
+    rows = await fetch_slots(
+        db, start - timedelta(days=1), end + timedelta(days=1)
+    )
+
+    # Roll UTC slots up into local dates
+    totals = {}
+    for utc_date, slots in rows:
+        for slot, seconds in enumerate(slots):
+            if seconds <= 0:
+                continue
+
+            for local_start, local_seconds in localize_slot(utc_date, slot, seconds, timezone):
+                local_date = local_start.date()
+                if start <= local_date <= end:
+                    totals[local_date] = totals.get(local_date, 0) + local_seconds
+
+    return totals
+
+async def load_stats_history(
+    db: AsyncSession,
+    timezone: str,
+    today_local: date,
+    refresh: bool = False
+) -> dict[date, int]:
+    """
+    Returns local date totals for closed days covered by
+    the widest stats window (year heatmap), from cache if possible.
+    Entries built from a replica that has not yet replayed the last
+    flush writing closed days are cached only for the staleness bound
+    """
+    history = None if refresh else stats_cache.get(timezone, today_local)
+    if history is None:
+        snapshot_at = await get_snapshot_time(db)
+        history = await load_local_date_totals(
+            db,
+            today_local - timedelta(days=STATS_HISTORY_DAYS - 1),
+            today_local - timedelta(days=1),
+            timezone
+        )
+
+        written_at = stats_cache.written_at(timezone)
+        ttl_seconds = None
+        if written_at is not None and snapshot_at < written_at:
+            ttl_seconds = min(settings.READ_MAX_STALENESS_SECONDS, settings.STATS_CACHE_TTL_SECONDS)
+        stats_cache.put(timezone, today_local, history, ttl_seconds)
+
+    return history
+
+def build_date_totals_collection(
+    daily_totals: dict[date, int],
+    range_length: int,
+    start: date
+) -> list[DailyStatistics]:
+    """
+    Builds a list of all dates within a range
+    with total seconds for each
+    """
+    # Build date window
+    window_dates = [start + timedelta(days=i) for i in range(range_length)]
 
     # Fill in missing dates with 0 seconds
     daily_records = []
     for date in window_dates:
-        seconds = daily_totals_db.get(date, 0)
+        seconds = daily_totals.get(date, 0)
 
         daily_records.append(
             DailyStatistics(
@@ -96,73 +263,270 @@ async def build_date_totals_collection(
     
     return daily_records
 
-@router.post("/flush", status_code=status.HTTP_201_CREATED)
-async def flush_recorded_sessions(
-    payload: SessionList,
-    db: AsyncSession = Depends(get_async_db)
-) -> dict:
-    
-    # Validate user timezone
-    user_timezone = payload.timezone
-    validate_timezone(user_timezone)
-    
-    accepted = 0
-    rejected_session_ids = []
-    processed_session_ids = []
-
-    for session in payload.sessions:
-        
-        # REMAKE DE-DUPLICATION TO WORK ACROSS MULTIPLE REQUESTS
-        if session.id in processed_session_ids:
-            rejected_session_ids.append(session.id)
-            continue
-
-        # Reject session if timestamps invalid
-        if session.end <= session.start:
-            rejected_session_ids.append(session.id)
-            continue
-
-        # Check if host exists in database. If not, create
-        host = await db.scalar(
-            select(HostModel).where(
-                HostModel.name == session.host,
+async def select_top_hosts(
+    db: AsyncSession,
+    start: date,
+    end: date,
+    top: int,
+    exact: bool = False
+) -> TopHosts:
+    """
+    Selects top hosts by time spent within a date range,
+    along with seconds spent on all remaining hosts.
+    Whole months are read from monthly rollups and only partial
+    edge months from daily buckets, unless exact scan is requested.
+    Dates are local days of the upload timezone, not the query one
+    """
+    if exact:
+        full_months, edges = [], [(start, end)]
+    else:
+        full_months, edges = split_range_by_months(start, end)
+
+    # Per-host seconds from rollups and daily buckets
+    parts = []
+    if full_months:
+        parts.append(
+            select(
+                MonthlyHostTotalModel.host_id.label("host_id"),
+                MonthlyHostTotalModel.duration_seconds.label("seconds")
             )
+            .where(MonthlyHostTotalModel.month.in_(full_months))
         )
-        if host is None:
-            db_host = HostModel(name=session.host)
-            db.add(db_host)
-            await db.flush()
-        else:
-            db_host = host
+    if edges:
+        parts.append(
+            select(
+                DailyTimeBucketModel.host_id.label("host_id"),
+                DailyTimeBucketModel.duration_seconds.label("seconds")
+            )
+            .where(or_(*[
+                DailyTimeBucketModel.date.between(edge_start, edge_end)
+                for edge_start, edge_end in edges
+            ]))
+        )
+    combined = union_all(*parts).subquery() if len(parts) > 1 else parts[0].subquery()
 
-        # Split into buckets
-        bucket_updates = split_into_daily_buckets(
-            session.start, session.end, user_timezone
+    totals = (
+        select(
+            combined.c.host_id,
+            func.sum(combined.c.seconds).label("seconds")
         )
+        .group_by(combined.c.host_id)
+        .subquery()
+    )
 
-        # Update or create new buckets
-        for local_date, seconds in bucket_updates:
-            if seconds <= 0:
-                continue
+    # Window sum is computed before LIMIT, giving the grand total.
+    # The other host sorts last and is only fetched so the total
+    # is known when there are no more than top regular hosts
+    stmt = (
+        select(
+            HostModel.id,
+            HostModel.name,
+            totals.c.seconds,
+            func.sum(totals.c.seconds).over()
+        )
+        .join(totals, HostModel.id == totals.c.host_id)
+        .order_by(HostModel.name == OTHER_HOST_NAME, totals.c.seconds.desc(), HostModel.id)
+        .limit(top + 1)
+    )
+    result = await db.execute(stmt)
+    rows = result.all()
+
+    grand_total = rows[0][3] if rows else 0
+    hosts = [row for row in rows if row[1] != OTHER_HOST_NAME][:top]
+    top_total = sum(total_seconds for _, _, total_seconds, _ in hosts)
 
-            await upsert_time_buckets(
-                db=db,
-                host_id=db_host.id,
-                date=local_date,
-                duration_seconds=seconds
+    return TopHosts(
+        total=len(hosts),
+        hosts=[
+            Host(id=host_id, hostname=hostname, seconds=total_seconds)
+            for host_id, hostname, total_seconds, _ in hosts
+        ],
+        other_seconds=grand_total - top_total
+    )
+
+async def resolve_host_ids(
+    db: AsyncSession,
+    host_names: set[str]
+) -> dict[str, int]:
+    """
+    Maps hostnames to host IDs, creating missing hosts
+    """
+    if not host_names:
+        return {}
+
+    result = await db.execute(
+        select(HostModel.name, HostModel.id).where(
+            HostModel.name.in_(host_names)
+        )
+    )
+    host_ids = dict(result.all())
+
+    missing = sorted(host_names - host_ids.keys())
+    if missing:
+        # Concurrent flushes may insert the same hosts, conflicting rows
+        # are skipped and read back instead of failing the transaction
+        result = await db.execute(
+            insert(HostModel)
+            .values([{"name": name} for name in missing])
+            .on_conflict_do_nothing(index_elements=[HostModel.name])
+            .returning(HostModel.name, HostModel.id)
+        )
+        host_ids.update(result.all())
+
+    if len(host_ids) < len(host_names):
+        result = await db.execute(
+            select(HostModel.name, HostModel.id).where(
+                HostModel.name.in_(host_names - host_ids.keys())
             )
-            
-        accepted += 1
-        processed_session_ids.append(session.id)
+        )
+        host_ids.update(result.all())
+
+    return host_ids
+
+async def apply_bucket_increments(
+    db: AsyncSession,
+    increments: BucketIncrements,
+    host_ids: dict[str, int] | None = None
+) -> None:
+    """
+    Upserts daily, hourly and monthly bucket increments.
+    Increments are keyed by hostname mapped through host_ids,
+    or directly by host ID when no mapping is given
+    """
+    def in_key_order(buckets):
+        """
+        Yields (host ID, date, value) sorted by key. Concurrent flushes
+        then lock shared rows in the same order and cannot deadlock
+        """
+        return sorted(
+            (host if host_ids is None else host_ids[host], day, value)
+            for (host, day), value in buckets.items()
+        )
+
+    # Update or create new buckets
+    for host_id, local_date, seconds in in_key_order(increments.daily):
+        await upsert_time_buckets(
+            db=db,
+            host_id=host_id,
+            date=local_date,
+            duration_seconds=seconds
+        )
+
+    # Update or create hourly buckets
+    for host_id, utc_date, slots in in_key_order(increments.hourly):
+        await upsert_hourly_buckets(
+            db=db,
+            host_id=host_id,
+            date=utc_date,
+            slots=slots
+        )
+
+    # Update or create monthly host rollups
+    for host_id, month, seconds in in_key_order(increments.monthly):
+        await upsert_monthly_totals(
+            db=db,
+            host_id=host_id,
+            month=month,
+            duration_seconds=seconds
+        )
 
+async def store_flush_batch(db: AsyncSession, batch: PreparedBatch) -> list[str]:
+    """
+    Writes a prepared batch in one transaction: hosts, buckets,
+    budget usage and raw log. Returns hosts over budget today
+    """
+    # Check if hosts exist in database. If not, create
+    host_ids = await resolve_host_ids(db, batch.increments.hosts)
+
+    await apply_bucket_increments(db, batch.increments, host_ids)
+    await apply_budget_usage(db, batch.increments, host_ids)
+
+    # Keep accepted sessions in append-only raw log for rebuilds
+    if batch.sessions:
+        db.add(RawSessionBatchModel(
+            timezone=batch.timezone,
+            session_count=len(batch.sessions),
+            first_start=batch.earliest_start,
+            last_end=max(end for _, _, _, end in batch.sessions),
+            payload=encode_sessions([
+                (host_ids[host], session_id, start, end)
+                for host, session_id, start, end in batch.sessions
+            ])
+        ))
+
+    over_budget_hosts = await get_over_budget_hosts(db, batch.timezone)
     await db.commit()
 
+    return over_budget_hosts
+
+async def store_flush_batch_with_retry(db: AsyncSession, batch: PreparedBatch) -> list[str]:
+    """
+    Stores a prepared batch, retrying on serialization failures and
+    deadlocks. Those roll back the whole transaction, so the batch is
+    simply written again. Raises 503 once retries are exhausted
+    """
+    for attempt in range(settings.FLUSH_TRANSACTION_RETRIES + 1):
+        try:
+            return await store_flush_batch(db, batch)
+        except DBAPIError as e:
+            await db.rollback()
+            if not is_transient_conflict(e):
+                raise
+            if attempt == settings.FLUSH_TRANSACTION_RETRIES:
+                raise overloaded_error(status.HTTP_503_SERVICE_UNAVAILABLE)
+            await asyncio.sleep(random.uniform(0, settings.FLUSH_RETRY_BACKOFF_SECONDS * 2 ** attempt))
+
+@router.post(
+    "/flush",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(acquire_flush_slot)],
+    # Body is decoded manually, so the schema is declared explicitly
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/json": {
+                    "schema": {"$ref": "#/components/schemas/SessionList"}
+                }
+            },
+            "required": True
+        }
+    }
+)
+async def flush_recorded_sessions(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+) -> dict:
+
+    # Validate and split sessions, large payloads go to the worker pool
+    body = await request.body()
+    try:
+        batch = await run_prepare_flush_batch(body)
+    except FlushPayloadError as e:
+        raise RequestValidationError(e.errors, body=body)
+    except ZoneInfoNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid timezone"
+        )
+
+    stats_cache.mark_active(batch.timezone)
+
+    # Taken before commit, a replica that replayed this flush is past it
+    started_at = datetime.now(dt_timezone.utc)
+    over_budget_hosts = await store_flush_batch_with_retry(db, batch)
+
+    # Drop precomputed history that now misses written time
+    if batch.earliest_start is not None:
+        stats_cache.invalidate_before(batch.earliest_start, started_at)
+
     return {
         "message": "Data has been stored",
-        "received": payload.total,
-        "accepted": accepted,
-        "success_rate": f"{accepted} / {payload.total}",
-        "rejected_session_ids": rejected_session_ids
+        "received": batch.total,
+        "accepted": batch.accepted,
+        "success_rate": f"{batch.accepted} / {batch.total}",
+        "rejected_session_ids": batch.rejected_session_ids,
+        "next_sync_seconds": suggest_next_sync_seconds(),
+        "over_budget_hosts": over_budget_hosts
     }
 
 @router.post("/flush/mock", status_code=status.HTTP_201_CREATED)
@@ -171,26 +535,39 @@ async def mock_flush_data_request(
 ):
     return payload
 
-@router.get("/stats", response_model=Statistics, status_code=status.HTTP_200_OK)
-async def get_time_statistics(
-    period: PeriodType = Query(..., description="Period type (week/month)"),
-    timezone: str = Query(..., description="IANA name for user timezone"),
-    db: AsyncSession = Depends(get_async_db)
-):
-    # Validate user timezone
-    validate_timezone(timezone)
+async def load_daily_totals(
+    db: AsyncSession,
+    timezone: str,
+    today_local: date
+) -> dict[date, int]:
+    """
+    Returns local date totals for the widest stats window.
+    Closed days come from precomputed history, only today is queried live
+    """
+    history = await load_stats_history(db, timezone, today_local)
+    today_totals = await load_local_date_totals(db, today_local, today_local, timezone)
 
-    # Compute current local date
-    today_local = datetime.now(ZoneInfo(timezone)).date()
+    return history | today_totals
 
+async def build_statistics(
+    db: AsyncSession,
+    period: PeriodType,
+    today_local: date,
+    daily_totals: dict[date, int],
+    top: int,
+    exact: bool
+) -> Statistics:
+    """
+    Builds statistics for a period from local date totals
+    """
     # Compute stats range
-    days = 7 if period == PeriodType.WEEK else 30
+    days = PERIOD_DAYS[period]
 
     range_start = today_local - timedelta(days=days - 1)
     range_end = today_local
 
-    daily_records_period = await build_date_totals_collection(
-        db, days, range_start, range_end
+    daily_records_period = build_date_totals_collection(
+        daily_totals, days, range_start
     )
 
     # Compute totals
@@ -204,13 +581,12 @@ async def get_time_statistics(
     )
 
     # Prepare heatmap data
-    heatmap_days = 30 if period == PeriodType.WEEK else 365
+    heatmap_days = HEATMAP_DAYS[period]
 
     heatmap_start = today_local - timedelta(days=heatmap_days - 1)
-    heatmap_end = today_local
     
-    daily_records_heatmap = await build_date_totals_collection(
-        db, heatmap_days, heatmap_start, heatmap_end
+    daily_records_heatmap = build_date_totals_collection(
+        daily_totals, heatmap_days, heatmap_start
     )
 
     heatmap_data = Heatmap(
@@ -219,32 +595,12 @@ async def get_time_statistics(
     )
 
     # Select top hosts by time spent within stats range
-    stmt = (
-        select(
-            HostModel.id,
-            HostModel.name,
-            func.sum(DailyTimeBucketModel.duration_seconds)
-        )
-        .join(DailyTimeBucketModel)
-        .where(DailyTimeBucketModel.date.between(range_start, range_end))
-        .group_by(HostModel.id)
-        .order_by(func.sum(DailyTimeBucketModel.duration_seconds).desc())
-        .limit(3)
-    )
-    result = await db.execute(stmt)
-    hosts = result.all()
-
-    # Prepare top hosts data
-    top_hosts = TopHosts(
-        total=len(hosts),
-        hosts=[
-            Host(id=host_id, hostname=hostname, seconds=total_seconds)
-            for host_id, hostname, total_seconds in hosts
-        ]
+    top_hosts = await select_top_hosts(
+        db, range_start, range_end, top, exact
     )
 
     # Build complete response model
-    stats = Statistics(
+    return Statistics(
         period=period,
         range_start=range_start.isoformat(),
         range_end=range_end.isoformat(),
@@ -255,13 +611,160 @@ async def get_time_statistics(
         top_hosts=top_hosts
     )
 
+@router.get("/stats", response_model=Statistics, status_code=status.HTTP_200_OK)
+async def get_time_statistics(
+    period: PeriodType = Query(..., description="Period type (week/month/year)"),
+    timezone: str = Query(..., description="IANA name for user timezone"),
+    top: int = Query(3, ge=1, le=100, description="Number of top hosts to select"),
+    exact: bool = Query(False, description="Compute top hosts from daily buckets only"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    # Validate user timezone
+    validate_timezone(timezone)
+
+    # Compute current local date
+    today_local = datetime.now(ZoneInfo(timezone)).date()
+
+    daily_totals = await load_daily_totals(db, timezone, today_local)
+
+    stats = await build_statistics(
+        db, period, today_local, daily_totals, top, exact
+    )
+
     return stats
 
+@router.get("/stats/batch", response_model=BatchStatistics, status_code=status.HTTP_200_OK)
+async def get_batch_statistics(
+    timezone: str = Query(..., description="IANA name for user timezone"),
+    periods: list[PeriodType] = Query([], description="Period types to include (week/month/year)"),
+    start: date | None = Query(None, description="First local date of custom range"),
+    end: date | None = Query(None, description="Last local date of custom range"),
+    top: int = Query(3, ge=1, le=100, description="Number of top hosts to select"),
+    exact: bool = Query(False, description="Compute top hosts from daily buckets only"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Returns statistics for several periods and an optional custom range
+    in one response. All windows are cut from a single pass over
+    the widest window
+    """
+    # Validate user timezone
+    validate_timezone(timezone)
+
+    if (start is None) != (end is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Custom range requires both start and end"
+        )
+    if start is not None and not (0 <= (end - start).days < STATS_HISTORY_DAYS + 1):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Custom range must span 1 to {STATS_HISTORY_DAYS + 1} days"
+        )
+
+    # Compacted months keep only monthly totals, daily records
+    # and exact top hosts cannot be built for them
+    cutoff = compaction_cutoff()
+    if start is not None and cutoff is not None and start < cutoff:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Custom range must start on or after {cutoff.isoformat()}, earlier months are compacted"
+        )
+
+    # Compute current local date
+    today_local = datetime.now(ZoneInfo(timezone)).date()
+
+    daily_totals = await load_daily_totals(db, timezone, today_local)
+
+    batch = BatchStatistics()
+
+    # Duplicate periods are computed once
+    for period in dict.fromkeys(periods):
+        batch.periods.append(
+            await build_statistics(db, period, today_local, daily_totals, top, exact)
+        )
+
+    if start is not None:
+        days = (end - start).days + 1
+
+        # Ranges outside the widest window need their own pass
+        history_start = today_local - timedelta(days=STATS_HISTORY_DAYS - 1)
+        if start < history_start or end > today_local:
+            range_totals = await load_local_date_totals(db, start, end, timezone)
+        else:
+            range_totals = daily_totals
+
+        records = build_date_totals_collection(range_totals, days, start)
+
+        batch.custom = CustomStatistics(
+            range_start=start.isoformat(),
+            range_end=end.isoformat(),
+            period_total=sum(record.seconds for record in records),
+            records=records,
+            top_hosts=await select_top_hosts(db, start, end, top, exact)
+        )
+
+    return batch
+
+@router.get("/heatmap/hourly", response_model=HourlyHeatmap, status_code=status.HTTP_200_OK)
+async def get_hourly_heatmap(
+    timezone: str = Query(..., description="IANA name for user timezone"),
+    days: int = Query(28, ge=1, le=365, description="Number of local days to cover"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Returns hour-of-week heatmap: total seconds for each
+    local weekday (Monday first) and local hour
+    """
+    # Validate user timezone
+    validate_timezone(timezone)
+
+    # Compute local range
+    range_end = datetime.now(ZoneInfo(timezone)).date()
+    range_start = range_end - timedelta(days=days - 1)
+
+    rows = await fetch_slots(
+        db, range_start - timedelta(days=1), range_end + timedelta(days=1)
+    )
+
+    # Fold UTC quarter-hour slots into local weekday/hour cells
+    weekdays = [[0] * HOURS_PER_DAY for _ in range(7)]
+    for utc_date, slots in rows:
+        for slot, seconds in enumerate(slots):
+            if seconds <= 0:
+                continue
+
+            for local_start, local_seconds in localize_slot(utc_date, slot, seconds, timezone):
+                if range_start <= local_start.date() <= range_end:
+                    weekdays[local_start.weekday()][local_start.hour] += local_seconds
+
+    return HourlyHeatmap(
+        range_start=range_start.isoformat(),
+        range_end=range_end.isoformat(),
+        days=days,
+        weekdays=weekdays
+    )
+
 @router.delete("/all", status_code=status.HTTP_200_OK)
 async def wipe_all_time(
     db: AsyncSession = Depends(get_async_db)
 ) -> dict:
-    await db.execute(delete(DailyTimeBucketModel))
+    # Truncate instead of deleting row by row
+    tables = ", ".join(
+        model.__tablename__ for model in (
+            DailyTimeBucketModel,
+            HourlyTimeBucketModel,
+            MonthlyHostTotalModel,
+            RawSessionBatchModel,
+            DailyBucketBaselineModel,
+            HourlyBucketBaselineModel,
+            BudgetUsageModel,
+        )
+    )
+    started_at = datetime.now(dt_timezone.utc)
+    await db.execute(text(f"TRUNCATE TABLE {tables}"))
     await db.commit()
 
+    stats_cache.clear(started_at)
+
     return {"message": "All time buckets deleted"}
\ No newline at end of file
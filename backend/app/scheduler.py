@@ -0,0 +1,59 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from app.config import settings
+from app.db_depends import get_async_read_db
+from app.routers.time import load_stats_history
+from app.stats_cache import stats_cache
+
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on sleep, so newly active timezones are picked up
+MAX_SLEEP_SECONDS = 60
+
+
+def seconds_until_next_midnight(timezone: str) -> float:
+    """
+    Returns seconds until the next local midnight in a timezone
+    """
+    now_local = datetime.now(ZoneInfo(timezone))
+    next_midnight_local = (now_local + timedelta(days=1)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    return (next_midnight_local - now_local).total_seconds()
+
+async def precompute_stats(timezone: str) -> None:
+    """
+    Loads stats history for the current local day of a timezone into cache
+    """
+    today_local = datetime.now(ZoneInfo(timezone)).date()
+    if not stats_cache.needs_refresh(timezone, today_local):
+        return
+
+    async for db in get_async_read_db():
+        await load_stats_history(db, timezone, today_local, refresh=True)
+
+    logger.info("Precomputed stats history for %s (%s)", timezone, today_local)
+
+async def run_stats_precompute() -> None:
+    """
+    Background loop: keeps stats history warm for every active
+    timezone and rebuilds it just after each local midnight
+    """
+    while True:
+        timezones = stats_cache.active_timezones()
+
+        for timezone in timezones:
+            try:
+                await precompute_stats(timezone)
+            except Exception:
+                logger.exception("Stats precompute failed for %s", timezone)
+
+        # Wake up shortly after the nearest local midnight
+        sleep_seconds = min(
+            [seconds_until_next_midnight(tz) for tz in timezones] + [MAX_SLEEP_SECONDS]
+        )
+        await asyncio.sleep(sleep_seconds + settings.MIDNIGHT_PRECOMPUTE_DELAY_SECONDS)
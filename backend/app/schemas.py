@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field, ConfigDict, field_validator, ValidationInfo, model_validator
 from typing import Annotated, Literal
+from typing_extensions import TypedDict, NotRequired
 from datetime import datetime
 from uuid import UUID
 
@@ -53,6 +54,24 @@ class SessionList(BaseModel):
         Field(default_factory=list, description="List of recorded sessions")
     ]
 
+class SessionRecord(TypedDict):
+    """
+    Plain dict counterpart of Session for the flush fast path.
+    Field constraints must match Session
+    """
+    id: UUID
+    host: Annotated[str, Field(min_length=1, max_length=256)]
+    start: datetime
+    end: datetime
+
+class SessionListRecord(TypedDict):
+    """
+    Plain dict counterpart of SessionList for the flush fast path
+    """
+    total: Annotated[int, Field(ge=0)]
+    timezone: Annotated[str, Field(min_length=1, max_length=64)]
+    sessions: NotRequired[list[SessionRecord]]
+
 class DailyStatistics(BaseModel):
     """
     Model that represents daily time records
@@ -95,8 +114,8 @@ class Graph(VisualizationBase):
     Model to collect data for graph build
     """
     days: Annotated[
-        Literal[7, 30],
-        Field(..., description="Number of days for graph (7 or 30)")
+        Literal[7, 30, 365],
+        Field(..., description="Number of days for graph (7, 30 or 365)")
     ]
     
 class Heatmap(VisualizationBase):
@@ -129,6 +148,10 @@ class Host(BaseModel):
 class TopHosts(BaseModel):
     """
     Model that represents most popular hosts (most time spent)
+    Read from daily buckets and monthly rollups, whose local days
+    are fixed by the timezone sent with each upload. Graph and
+    heatmaps use the query timezone instead, so range edges may
+    differ by the offset between the two
     """
     total: Annotated[
         int,
@@ -138,6 +161,10 @@ class TopHosts(BaseModel):
         list[Host],
         Field(default_factory=list, description="List of hosts")
     ]
+    other_seconds: Annotated[
+        int,
+        Field(0, ge=0, description="Seconds spent on all hosts outside the top")
+    ]
 
     @model_validator(mode="after")
     def check_records_length(self):
@@ -181,5 +208,201 @@ class Statistics(BaseModel):
     ]
     top_hosts: Annotated[
         TopHosts,
-        Field(..., description="Top hosts by time spent")
-    ]
\ No newline at end of file
+        Field(..., description="Top hosts by time spent. Day edges follow upload timezone, see TopHosts")
+    ]
+
+class HourlyHeatmap(BaseModel):
+    """
+    Model that represents hour-of-week heatmap
+    Seconds per local weekday (Monday first) and local hour
+    """
+    range_start: Annotated[
+        str,
+        Field(..., pattern=r"^\d{4}-\d{2}-\d{2}$",
+              description="ISO formated first local date in heatmap window")
+    ]
+    range_end: Annotated[
+        str,
+        Field(..., pattern=r"^\d{4}-\d{2}-\d{2}$",
+              description="ISO formated last local date in heatmap window")
+    ]
+    days: Annotated[
+        int,
+        Field(..., ge=1, le=365, description="Number of local days covered")
+    ]
+    weekdays: Annotated[
+        list[list[int]],
+        Field(..., description="7 rows (Monday to Sunday) of 24 hourly totals in seconds")
+    ]
+
+    @model_validator(mode="after")
+    def check_grid_shape(self):
+        if len(self.weekdays) != 7 or any(len(hours) != 24 for hours in self.weekdays):
+            raise ValueError("weekdays must be a 7x24 grid")
+        return self
+
+class ProfileCapture(BaseModel):
+    """
+    Model that represents a captured slow or profiled request
+    """
+    id: Annotated[
+        str,
+        Field(..., description="Capture ID")
+    ]
+    captured_at: Annotated[
+        str,
+        Field(..., description="ISO formatted UTC timestamp of capture")
+    ]
+    method: Annotated[
+        str,
+        Field(..., description="HTTP method of captured request")
+    ]
+    path: Annotated[
+        str,
+        Field(..., description="Path of captured request")
+    ]
+    status_code: Annotated[
+        int,
+        Field(..., description="Response status code")
+    ]
+    duration_ms: Annotated[
+        float,
+        Field(..., ge=0, description="Total request duration in milliseconds")
+    ]
+    sql_count: Annotated[
+        int,
+        Field(..., ge=0, description="Number of SQL statements executed")
+    ]
+    sql_time_ms: Annotated[
+        float,
+        Field(..., ge=0, description="Total time spent in SQL statements in milliseconds")
+    ]
+    profiled: Annotated[
+        bool,
+        Field(..., description="Whether profile artifacts were recorded")
+    ]
+
+class CustomStatistics(BaseModel):
+    """
+    Model used to pull statistics for an arbitrary date range
+    """
+    range_start: Annotated[
+        str,
+        Field(..., pattern=r"^\d{4}-\d{2}-\d{2}$",
+              description="ISO formated first date in stats window")
+    ]
+    range_end: Annotated[
+        str,
+        Field(..., pattern=r"^\d{4}-\d{2}-\d{2}$",
+              description="ISO formated last date in stats window")
+    ]
+    period_total: Annotated[
+        int,
+        Field(..., ge=0, description="Total seconds for chosen range")
+    ]
+    records: Annotated[
+        list[DailyStatistics],
+        Field(default_factory=list, description="Records for every date in range")
+    ]
+    top_hosts: Annotated[
+        TopHosts,
+        Field(..., description="Top hosts by time spent. Day edges follow upload timezone, see TopHosts")
+    ]
+
+class BatchStatistics(BaseModel):
+    """
+    Model used to pull statistics for several periods at once
+    """
+    periods: Annotated[
+        list[Statistics],
+        Field(default_factory=list, description="Statistics for each requested period")
+    ]
+    custom: Annotated[
+        CustomStatistics | None,
+        Field(None, description="Statistics for requested custom range")
+    ]
+
+class GroupCreate(BaseModel):
+    """
+    Schema is used for creating or updating a group of hosts
+    """
+    name: Annotated[
+        str,
+        Field(..., min_length=1, max_length=64, description="Group name")
+    ]
+    hosts: Annotated[
+        list[str],
+        Field(default_factory=list, description="Normalized hostnames in the group")
+    ]
+
+class Group(GroupCreate):
+    """
+    Model that represents a group of hosts
+    """
+    id: Annotated[
+        int,
+        Field(..., ge=1, description="Group ID")
+    ]
+
+class BudgetCreate(BaseModel):
+    """
+    Schema is used for setting a daily budget on a host or a group
+    """
+    host: Annotated[
+        str | None,
+        Field(None, min_length=1, max_length=256, description="Normalized hostname")
+    ]
+    group_id: Annotated[
+        int | None,
+        Field(None, ge=1, description="Group ID")
+    ]
+    limit_seconds: Annotated[
+        int,
+        Field(..., gt=0, description="Allowed seconds per local day")
+    ]
+
+    @model_validator(mode="after")
+    def check_single_target(self):
+        if (self.host is None) == (self.group_id is None):
+            raise ValueError("exactly one of host or group_id must be set")
+        return self
+
+class Budget(BudgetCreate):
+    """
+    Model that represents a daily budget
+    """
+    id: Annotated[
+        int,
+        Field(..., ge=1, description="Budget ID")
+    ]
+
+class BudgetState(Budget):
+    """
+    Model that represents budget usage for one local day
+    """
+    used_seconds: Annotated[
+        int,
+        Field(..., ge=0, description="Seconds used that day")
+    ]
+    over_budget: Annotated[
+        bool,
+        Field(..., description="Whether used time reached the limit")
+    ]
+
+class BudgetStatus(BaseModel):
+    """
+    Model used to pull budget state for the current local day
+    """
+    date: Annotated[
+        str,
+        Field(..., pattern=r"^\d{4}-\d{2}-\d{2}$",
+              description="ISO formatted local date")
+    ]
+    hosts_over_budget: Annotated[
+        list[str],
+        Field(default_factory=list, description="Hostnames whose host or group budget is used up")
+    ]
+    budgets: Annotated[
+        list[BudgetState],
+        Field(default_factory=list, description="Usage of every budget")
+    ]
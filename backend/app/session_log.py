@@ -0,0 +1,44 @@
+import struct
+import zlib
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+
+# Format version byte, then zlib-compressed fixed-size records:
+# host_id (int32), session UUID (16 bytes), start and end (int64 µs since epoch)
+LOG_FORMAT_VERSION = 1
+RECORD = struct.Struct("<i16sqq")
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def to_micros(moment: datetime) -> int:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    delta = moment - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+def from_micros(micros: int) -> datetime:
+    return EPOCH + timedelta(microseconds=micros)
+
+def encode_sessions(sessions: list[tuple[int, UUID, datetime, datetime]]) -> bytes:
+    """
+    Encodes (host_id, session_id, start, end) records into a compact blob
+    """
+    packed = b"".join(
+        RECORD.pack(host_id, session_id.bytes, to_micros(start), to_micros(end))
+        for host_id, session_id, start, end in sessions
+    )
+    return bytes([LOG_FORMAT_VERSION]) + zlib.compress(packed)
+
+def decode_sessions(blob: bytes) -> list[tuple[int, UUID, datetime, datetime]]:
+    """
+    Decodes blob written by encode_sessions
+    """
+    if not blob or blob[0] != LOG_FORMAT_VERSION:
+        raise ValueError("Unsupported session log format")
+
+    return [
+        (host_id, UUID(bytes=session_id), from_micros(start), from_micros(end))
+        for host_id, session_id, start, end in RECORD.iter_unpack(zlib.decompress(blob[1:]))
+    ]
@@ -0,0 +1,141 @@
+import time
+from dataclasses import dataclass
+from datetime import datetime, date, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+
+from app.config import settings
+
+
+@dataclass
+class HistoryEntry:
+    today_local: date
+    midnight_utc: datetime
+    built_at: float
+    ttl_seconds: float
+    totals: dict[date, int]
+
+
+def local_midnight_utc(timezone: str, today_local: date) -> datetime:
+    midnight_local = datetime(
+        today_local.year, today_local.month, today_local.day, tzinfo=ZoneInfo(timezone)
+    )
+    return midnight_local.astimezone(dt_timezone.utc)
+
+
+class StatsHistoryCache:
+    """
+    Per-process cache of closed local days for each timezone.
+    Totals for days before local today only change when a flush
+    writes time before that local midnight, so entries stay valid
+    across ordinary flushes and are rebuilt just after midnight.
+
+    The time of the last flush that wrote closed days is kept per
+    timezone, so entries built from a replica that has not replayed
+    it yet can be cached briefly instead of for the full TTL
+    """
+
+    def __init__(self, ttl_seconds: float, active_ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.active_ttl_seconds = active_ttl_seconds
+        self._entries: dict[str, HistoryEntry] = {}
+        self._active: dict[str, float] = {}
+        self._written_at: dict[str, datetime] = {}
+        self._cleared_at: datetime | None = None
+
+    def mark_active(self, timezone: str) -> None:
+        """
+        Records that a client in this timezone has flushed recently
+        """
+        self._active[timezone] = time.monotonic()
+
+    def active_timezones(self) -> list[str]:
+        """
+        Returns timezones seen in flushes within the activity window
+        """
+        now = time.monotonic()
+        for tz, seen_at in list(self._active.items()):
+            if now - seen_at > self.active_ttl_seconds:
+                del self._active[tz]
+                self._entries.pop(tz, None)
+                self._written_at.pop(tz, None)
+
+        return list(self._active)
+
+    def get(self, timezone: str, today_local: date) -> dict[date, int] | None:
+        entry = self._entries.get(timezone)
+        if entry is None or entry.today_local != today_local:
+            return None
+        if time.monotonic() - entry.built_at > entry.ttl_seconds:
+            return None
+        return entry.totals
+
+    def needs_refresh(self, timezone: str, today_local: date) -> bool:
+        """
+        True when entry is missing, belongs to a previous day
+        or is past half of its lifetime
+        """
+        entry = self._entries.get(timezone)
+        if entry is None or entry.today_local != today_local:
+            return True
+        return time.monotonic() - entry.built_at > entry.ttl_seconds / 2
+
+    def put(
+        self,
+        timezone: str,
+        today_local: date,
+        totals: dict[date, int],
+        ttl_seconds: float | None = None
+    ) -> None:
+        """
+        Stores an entry, for ttl_seconds when given and
+        for the cache TTL otherwise
+        """
+        self._entries[timezone] = HistoryEntry(
+            today_local=today_local,
+            midnight_utc=local_midnight_utc(timezone, today_local),
+            built_at=time.monotonic(),
+            ttl_seconds=self.ttl_seconds if ttl_seconds is None else ttl_seconds,
+            totals=totals
+        )
+
+    def written_at(self, timezone: str) -> datetime | None:
+        """
+        Returns when the last flush writing closed days of
+        a timezone started, None when not seen
+        """
+        times = [t for t in (self._written_at.get(timezone), self._cleared_at) if t is not None]
+        return max(times, default=None)
+
+    def invalidate_before(self, earliest_utc: datetime, written_at: datetime) -> None:
+        """
+        Drops entries whose closed days may include time written
+        starting at earliest_utc, by a flush started at written_at
+        """
+        if earliest_utc.tzinfo is None:
+            earliest_utc = earliest_utc.replace(tzinfo=dt_timezone.utc)
+
+        # Active timezones may have no entry yet, one built from
+        # a lagging replica must still be recognized as stale
+        for tz in self._entries.keys() | self._active.keys():
+            entry = self._entries.get(tz)
+            if entry is not None:
+                midnight_utc = entry.midnight_utc
+            else:
+                midnight_utc = local_midnight_utc(tz, datetime.now(ZoneInfo(tz)).date())
+
+            if earliest_utc < midnight_utc:
+                self._entries.pop(tz, None)
+                self._written_at[tz] = written_at
+
+    def clear(self, written_at: datetime) -> None:
+        """
+        Drops all entries after a wipe started at written_at
+        """
+        self._entries.clear()
+        self._cleared_at = written_at
+
+
+stats_cache = StatsHistoryCache(
+    ttl_seconds=settings.STATS_CACHE_TTL_SECONDS,
+    active_ttl_seconds=settings.ACTIVE_TIMEZONE_TTL_HOURS * 3600
+)
@@ -2,11 +2,19 @@ from datetime import datetime, timedelta, date, timezone
 from zoneinfo import ZoneInfo
 import zoneinfo
 from enum import Enum
+from functools import lru_cache
+
+
+# Quarter-hour slots of hourly buckets: every current UTC offset is
+# a whole number of slots, so a slot never straddles local midnight
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
 
 
 class PeriodType(Enum):
     WEEK = "week"
     MONTH = "month"
+    YEAR = "year"
 
 def split_into_daily_buckets(
     start_utc: datetime,
@@ -44,4 +52,115 @@ def split_into_daily_buckets(
         buckets.append((current_local.date(), duration))
         current_utc = segment_end_utc
         
-    return buckets
\ No newline at end of file
+    return buckets
+
+def split_into_slot_buckets(
+    start_utc: datetime,
+    end_utc: datetime
+) -> list[tuple[date, int, int]]:
+    """
+    Split a UTC session into UTC quarter-hour slots.
+    Returns: [(utc_date, slot, duration_seconds)]
+    """
+
+    # Return empty list in case of invalid timestamps
+    if end_utc <= start_utc:
+        return []
+
+    buckets = []
+
+    current_utc = start_utc.astimezone(timezone.utc)
+    end_utc = end_utc.astimezone(timezone.utc)
+
+    while current_utc < end_utc:
+        slot_start_utc = current_utc.replace(
+            minute=current_utc.minute - current_utc.minute % SLOT_MINUTES, second=0, microsecond=0
+        )
+        next_slot_utc = slot_start_utc + timedelta(minutes=SLOT_MINUTES)
+
+        segment_end_utc = min(next_slot_utc, end_utc)
+
+        duration = int((segment_end_utc - current_utc).total_seconds())
+
+        # Sub-second segments have no daily counterpart, skip them too
+        if duration > 0:
+            slot = (current_utc.hour * 60 + current_utc.minute) // SLOT_MINUTES
+            buckets.append((current_utc.date(), slot, duration))
+        current_utc = segment_end_utc
+
+    return buckets
+
+@lru_cache(maxsize=4096)
+def slot_offsets(user_tz: str, utc_date: date) -> tuple[timedelta, ...]:
+    """
+    Offset table for one UTC date: UTC offset of the zone
+    at the start of each of the quarter-hour UTC slots
+    """
+    tz = ZoneInfo(user_tz)
+    midnight_utc = datetime(utc_date.year, utc_date.month, utc_date.day, tzinfo=timezone.utc)
+
+    return tuple(
+        (midnight_utc + timedelta(minutes=slot * SLOT_MINUTES)).astimezone(tz).utcoffset()
+        for slot in range(SLOTS_PER_DAY)
+    )
+
+def localize_slot(
+    utc_date: date,
+    slot: int,
+    seconds: int,
+    user_tz: str
+) -> list[tuple[datetime, int]]:
+    """
+    Map a UTC quarter-hour slot onto local time.
+    Slots that straddle local midnight (historical offsets
+    that are not whole quarter hours) are split proportionally.
+    Returns: [(local_slot_start, duration_seconds)]
+    """
+    offset = slot_offsets(user_tz, utc_date)[slot]
+    local_start = (
+        datetime(utc_date.year, utc_date.month, utc_date.day)
+        + timedelta(minutes=slot * SLOT_MINUTES)
+        + offset
+    )
+
+    next_midnight_local = local_start.replace(
+        hour=0, minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+    before_midnight = int((next_midnight_local - local_start).total_seconds())
+
+    slot_seconds = SLOT_MINUTES * 60
+    if before_midnight >= slot_seconds:
+        return [(local_start, seconds)]
+
+    head = seconds * before_midnight // slot_seconds
+    return [(local_start, head), (next_midnight_local, seconds - head)]
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+def split_range_by_months(
+    start: date,
+    end: date
+) -> tuple[list[date], list[tuple[date, date]]]:
+    """
+    Split a date range into whole calendar months and partial edges.
+    Returns: ([first day of each whole month], [(edge_start, edge_end)])
+    """
+    full_months = []
+    edges = []
+
+    current = start
+    while current <= end:
+        next_month = (month_start(current) + timedelta(days=32)).replace(day=1)
+        segment_end = min(next_month - timedelta(days=1), end)
+
+        if current.day == 1 and segment_end == next_month - timedelta(days=1):
+            full_months.append(current)
+        elif edges and edges[-1][1] == current - timedelta(days=1):
+            edges[-1] = (edges[-1][0], segment_end)
+        else:
+            edges.append((current, segment_end))
+
+        current = segment_end + timedelta(days=1)
+
+    return full_months, edges
@@ -0,0 +1,91 @@
+"""
+Measures bytes on the wire and CPU per request for compressed
+stats responses and flush uploads.
+
+Payloads are synthetic but shaped like real ones: a year stats
+response with graph, heatmap and top hosts, and flush backlogs of
+several sizes. Each supported encoding is run at the configured
+level (GZIP_LEVEL, ZSTD_LEVEL) through the middleware's own codec.
+
+    python -m scripts.bench_compression [--iterations N]
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+from app.compression import compress, decompress, supported_encodings
+from app.config import settings
+
+
+def build_stats_response(days: int = 365, top: int = 10) -> bytes:
+    today = date.today()
+    records = [
+        {"date": (today - timedelta(days=days - 1 - i)).isoformat(), "seconds": random.randint(0, 30000)}
+        for i in range(days)
+    ]
+    return json.dumps({
+        "period": "year",
+        "range_start": records[0]["date"],
+        "range_end": records[-1]["date"],
+        "today_total": records[-1]["seconds"],
+        "period_total": sum(record["seconds"] for record in records),
+        "graph": {"days": days, "records": records},
+        "heatmap": {"days": days, "records": records},
+        "top_hosts": {
+            "total": top,
+            "hosts": [
+                {"id": i + 1, "hostname": f"host-{i}.example.com", "seconds": random.randint(0, 10 ** 6)}
+                for i in range(top)
+            ],
+            "other_seconds": random.randint(0, 10 ** 6),
+        },
+    }).encode()
+
+def build_flush_payload(session_count: int, host_count: int = 50) -> bytes:
+    now = datetime.now(timezone.utc)
+    sessions = []
+    for _ in range(session_count):
+        start = now - timedelta(seconds=random.randint(60, 7 * 86400))
+        sessions.append({
+            "id": str(uuid.uuid4()),
+            "host": f"host-{random.randrange(host_count)}.example.com",
+            "start": start.isoformat(),
+            "end": (start + timedelta(seconds=random.randint(5, 1800))).isoformat(),
+        })
+    return json.dumps({"total": session_count, "timezone": "Europe/Warsaw", "sessions": sessions}).encode()
+
+def cpu_per_call(func, iterations: int) -> float:
+    """
+    Returns process CPU time per call in microseconds
+    """
+    started = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - started) / iterations * 1e6
+
+def report(name: str, body: bytes, iterations: int) -> None:
+    print(f"{name}: {len(body)} bytes raw")
+    for encoding in supported_encodings():
+        compressed = compress(body, encoding)
+        encode_us = cpu_per_call(lambda: compress(body, encoding), iterations)
+        decode_us = cpu_per_call(
+            lambda: decompress(compressed, encoding, settings.MAX_DECOMPRESSED_BODY_BYTES), iterations
+        )
+        print(
+            f"  {encoding:>5}: {len(compressed):>8} bytes ({len(compressed) / len(body):6.1%}), "
+            f"compress {encode_us:8.1f} us, decompress {decode_us:8.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compression size and CPU per request")
+    parser.add_argument("--iterations", type=int, default=50, help="Calls per measurement")
+    args = parser.parse_args()
+
+    random.seed(0)
+    report("stats response (year)", build_stats_response(), args.iterations)
+    for session_count in (10, 500, 5000):
+        report(f"flush upload ({session_count} sessions)", build_flush_payload(session_count), args.iterations)
@@ -0,0 +1,66 @@
+"""
+Benchmarks flush payload validation in sessions per second.
+
+Compares the generic model path (SessionList.model_validate_json)
+with the precompiled adapter alone and with the full fast path used
+by /time/flush (adapter plus the end >= start pass).
+
+    python -m scripts.bench_session_validation [--sessions 5000] [--repeat 20]
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.flush_batch import SESSION_LIST_ADAPTER, validate_session_list
+from app.schemas import SessionList
+
+
+def build_payload(session_count: int) -> bytes:
+    now = datetime.now(timezone.utc)
+    sessions = []
+    for _ in range(session_count):
+        start = now - timedelta(seconds=random.randint(60, 30 * 86400))
+        sessions.append({
+            "id": str(uuid.uuid4()),
+            "host": f"host-{random.randrange(200)}.example.com",
+            "start": start.isoformat(),
+            "end": (start + timedelta(seconds=random.randint(1, 3600))).isoformat(),
+        })
+    return json.dumps({"total": session_count, "timezone": "Europe/Warsaw", "sessions": sessions}).encode()
+
+def sessions_per_second(func, body: bytes, session_count: int, repeat: int) -> float:
+    """
+    Best of repeat runs, so scheduler noise does not skew the result
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(body)
+        best = min(best, time.perf_counter() - started)
+    return session_count / best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Flush payload validation throughput")
+    parser.add_argument("--sessions", type=int, default=5000, help="Sessions per payload")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per decoder")
+    args = parser.parse_args()
+
+    random.seed(0)
+    body = build_payload(args.sessions)
+
+    decoders = {
+        "SessionList.model_validate_json": SessionList.model_validate_json,
+        "SESSION_LIST_ADAPTER.validate_json": SESSION_LIST_ADAPTER.validate_json,
+        "validate_session_list (fast path)": validate_session_list,
+    }
+
+    print(f"{args.sessions} sessions, {len(body)} bytes, best of {args.repeat}")
+    baseline = None
+    for name, decoder in decoders.items():
+        rate = sessions_per_second(decoder, body, args.sessions, args.repeat)
+        baseline = baseline or rate
+        print(f"  {name:<36} {rate:>12,.0f} sessions/s  ({rate / baseline:.2f}x)")
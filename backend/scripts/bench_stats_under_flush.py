@@ -0,0 +1,108 @@
+"""
+Measures /time/stats latency while large flushes are being uploaded.
+
+Stats are polled alone first, then again with concurrent flushers
+posting large backlog payloads. Percentiles of both phases show how
+much flush preparation leaks into stats latency.
+
+Runs against a live server with a database it may write to:
+    python -m scripts.bench_stats_under_flush --url http://localhost:8000
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import urllib.error
+import urllib.request
+import uuid
+from datetime import datetime, timedelta, timezone
+
+
+def build_payload(session_count: int, host_count: int, tz: str) -> bytes:
+    """
+    Builds a flush payload of random sessions from the last 30 days
+    """
+    now = datetime.now(timezone.utc)
+    sessions = []
+    for _ in range(session_count):
+        start = now - timedelta(seconds=random.randint(3600, 30 * 86400))
+        sessions.append({
+            "id": str(uuid.uuid4()),
+            "host": f"bench-{random.randrange(host_count)}.example",
+            "start": start.isoformat(),
+            "end": (start + timedelta(seconds=random.randint(10, 3600))).isoformat(),
+        })
+
+    return json.dumps({"total": session_count, "timezone": tz, "sessions": sessions}).encode()
+
+def request(url: str, body: bytes | None = None) -> int:
+    """
+    Sends a blocking request and returns its status code,
+    0 when the connection failed
+    """
+    req = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=120) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except urllib.error.URLError:
+        return 0
+
+async def poll_stats(url: str, until: float, latencies: list[float]) -> None:
+    while time.monotonic() < until:
+        started = time.perf_counter()
+        await asyncio.to_thread(request, url)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+async def flush_loop(url: str, payload_args: tuple, until: float, codes: list[int]) -> None:
+    while time.monotonic() < until:
+        # Fresh session IDs every time, so nothing is rejected as duplicate
+        body = await asyncio.to_thread(build_payload, *payload_args)
+        codes.append(await asyncio.to_thread(request, url, body))
+
+async def run_phase(args, with_flushes: bool) -> tuple[list[float], list[int]]:
+    stats_url = f"{args.url}/time/stats?period=week&timezone={args.timezone}"
+    flush_url = f"{args.url}/time/flush"
+    until = time.monotonic() + args.seconds
+
+    latencies, codes = [], []
+    tasks = [poll_stats(stats_url, until, latencies) for _ in range(args.pollers)]
+    if with_flushes:
+        payload_args = (args.flush_sessions, args.hosts, args.timezone)
+        tasks += [flush_loop(flush_url, payload_args, until, codes) for _ in range(args.flushers)]
+
+    await asyncio.gather(*tasks)
+    return latencies, codes
+
+def report(name: str, latencies: list[float]) -> None:
+    centiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:>12}: {len(latencies)} requests, "
+        f"p50 {centiles[49]:.1f} ms, p95 {centiles[94]:.1f} ms, p99 {centiles[98]:.1f} ms"
+    )
+
+async def main(args) -> None:
+    baseline, _ = await run_phase(args, with_flushes=False)
+    loaded, codes = await run_phase(args, with_flushes=True)
+
+    report("stats alone", baseline)
+    report("with flushes", loaded)
+
+    statuses = {code: codes.count(code) for code in sorted(set(codes))}
+    print(f"     flushes: {len(codes)} of {args.flush_sessions} sessions, statuses {statuses}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stats latency under large flush load")
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of the API")
+    parser.add_argument("--timezone", default="Europe/Warsaw", help="Timezone of stats and flushes")
+    parser.add_argument("--seconds", type=float, default=30, help="Duration of each phase")
+    parser.add_argument("--pollers", type=int, default=4, help="Concurrent stats pollers")
+    parser.add_argument("--flushers", type=int, default=4, help="Concurrent flush uploaders")
+    parser.add_argument("--flush-sessions", type=int, default=5000, help="Sessions per flush payload")
+    parser.add_argument("--hosts", type=int, default=200, help="Distinct hosts in payloads")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,173 @@
+"""
+Thundering-herd test: many clients wake at the same moment, each
+flushing a backlog and then reading stats and budget status, the
+way the extension syncs and the popup opens after a network outage.
+
+Flushes go through the flush limiter and the same store path as
+/time/flush. Stats and budget reads are not admitted by the limiter,
+they only wait for a pooled connection like their routes do. The
+report shows limiter outcomes, peak pool checkouts against pool
+capacity and pool timeouts per request kind.
+
+Writes to the configured DATABASE_URL, test hosts and their logged
+batches are removed afterwards:
+    python -m scripts.flush_herd [--clients 500] [--spread 0]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+from fastapi import HTTPException
+from sqlalchemy import event, select, func
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.admission import flush_limiter
+from app.budget_usage import build_budget_status
+from app.config import settings
+from app.database import async_engine, async_read_engine, async_session_maker
+from app.db_depends import get_async_read_db
+from app.flush_batch import prepare_flush_batch
+from app.models.raw_session_batches import RawSessionBatch as RawSessionBatchModel
+from app.routers.time import load_daily_totals, store_flush_batch_with_retry
+from scripts.flush_stress import build_payload, delete_test_data
+
+
+class PoolTracker:
+    """
+    Counts connections checked out of an engine pool
+    """
+
+    def __init__(self, engine):
+        self.checked_out = 0
+        self.peak = 0
+        self.checkouts = 0
+        event.listen(engine.sync_engine, "checkout", self.on_checkout)
+        event.listen(engine.sync_engine, "checkin", self.on_checkin)
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.checked_out += 1
+        self.checkouts += 1
+        self.peak = max(self.peak, self.checked_out)
+
+    def on_checkin(self, dbapi_connection, connection_record):
+        self.checked_out -= 1
+
+
+async def timed(kind: str, call, outcomes: Counter, latencies: dict[str, list[float]]) -> None:
+    """
+    Runs one request and records its outcome and latency by kind
+    """
+    started = time.perf_counter()
+    try:
+        await call()
+        outcome = "ok"
+    except HTTPException as e:
+        outcome = str(e.status_code)
+    except PoolTimeoutError:
+        outcome = "pool timeout"
+    except Exception as e:
+        outcome = type(e).__name__
+    outcomes[(kind, outcome)] += 1
+    latencies.setdefault(kind, []).append((time.perf_counter() - started) * 1000)
+
+def report(kind: str, outcomes: Counter, latencies: list[float]) -> None:
+    results = {outcome: count for (k, outcome), count in sorted(outcomes.items()) if k == kind}
+    line = f"  {kind:>7}: {results}"
+    if len(latencies) > 1:
+        centiles = statistics.quantiles(latencies, n=100)
+        line += f", p50 {centiles[49]:.0f} ms, p99 {centiles[98]:.0f} ms"
+    print(line)
+
+async def run_client(body: bytes, tz: str, spread: float, outcomes: Counter, latencies: dict) -> None:
+    await asyncio.sleep(random.uniform(0, spread))
+
+    async def flush():
+        batch = prepare_flush_batch(body)
+        await flush_limiter.acquire()
+        try:
+            async with async_session_maker() as db:
+                await store_flush_batch_with_retry(db, batch)
+        finally:
+            flush_limiter.release()
+
+    async def stats():
+        async for db in get_async_read_db():
+            await load_daily_totals(db, tz, datetime.now(ZoneInfo(tz)).date())
+
+    async def budgets():
+        async with async_session_maker() as db:
+            await build_budget_status(db, tz)
+
+    await timed("flush", flush, outcomes, latencies)
+    await asyncio.gather(
+        timed("stats", stats, outcomes, latencies),
+        timed("budgets", budgets, outcomes, latencies)
+    )
+
+async def main(args) -> int:
+    # Engine echoes every statement by default, far too noisy here
+    async_engine.sync_engine.echo = False
+    if async_read_engine is not None:
+        async_read_engine.sync_engine.echo = False
+
+    primary = PoolTracker(async_engine)
+    replica = PoolTracker(async_read_engine) if async_read_engine is not None else None
+
+    host_prefix = f"herd-{uuid.uuid4().hex[:8]}-"
+    hosts = [f"{host_prefix}{i}.example" for i in range(args.hosts)]
+    anchor = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    bodies = [
+        build_payload(hosts, args.sessions, args.timezone, anchor, args.days)
+        for _ in range(args.clients)
+    ]
+
+    async with async_session_maker() as db:
+        last_batch_id = await db.scalar(select(func.coalesce(func.max(RawSessionBatchModel.id), 0)))
+
+    outcomes = Counter()
+    latencies = {}
+    capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    print(f"{args.clients} clients waking within {args.spread}s, flush limiter admits "
+          f"{flush_limiter.max_concurrency} with queue {flush_limiter.max_queue}, pool capacity {capacity}")
+
+    await asyncio.gather(*[
+        run_client(body, args.timezone, args.spread, outcomes, latencies)
+        for body in bodies
+    ])
+
+    for kind in ("flush", "stats", "budgets"):
+        report(kind, outcomes, latencies.get(kind, []))
+
+    print(f"  primary pool: peak {primary.peak}/{capacity} checked out, {primary.checkouts} checkouts")
+    if replica is not None:
+        print(f"  replica pool: peak {replica.peak}/{capacity} checked out, {replica.checkouts} checkouts")
+
+    if not args.keep:
+        deleted = await delete_test_data(host_prefix, last_batch_id)
+        print(f"Removed {len(hosts)} test hosts and {deleted} logged batches")
+
+    await async_engine.dispose()
+    if async_read_engine is not None:
+        await async_read_engine.dispose()
+
+    timeouts = sum(count for (_, outcome), count in outcomes.items() if outcome == "pool timeout")
+    print("PASS" if timeouts == 0 else f"FAIL: {timeouts} pool timeouts")
+    return 0 if timeouts == 0 else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Thundering-herd flush test")
+    parser.add_argument("--clients", type=int, default=500, help="Clients waking at once")
+    parser.add_argument("--spread", type=float, default=0, help="Seconds over which clients wake")
+    parser.add_argument("--sessions", type=int, default=50, help="Sessions per flush")
+    parser.add_argument("--hosts", type=int, default=20, help="Shared hosts across clients")
+    parser.add_argument("--days", type=int, default=3, help="Days the sessions are spread over")
+    parser.add_argument("--timezone", default="Europe/Warsaw", help="Timezone of clients")
+    parser.add_argument("--keep", action="store_true", help="Keep test hosts, buckets and logged batches")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,173 @@
+"""
+Stress test for concurrent flushes against a local database.
+
+Fires hundreds of flushes in parallel at the same few new hosts and
+the same dates, through the same prepare and store path as
+/time/flush. Passes when no flush fails (unique violations, deadlocks,
+exhausted retries) and the stored daily, hourly and monthly buckets
+equal the sum of all payloads.
+
+Writes to the configured DATABASE_URL, test hosts and the raw log
+batches of test flushes are removed afterwards:
+    python -m scripts.flush_stress [--flushes 300] [--concurrency 300]
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, delete, func
+
+from app.database import async_engine, async_session_maker
+from app.flush_batch import BucketIncrements, prepare_flush_batch
+from app.models.hosts import Host as HostModel
+from app.models.daily_time_buckets import DailyTimeBucket as DailyTimeBucketModel
+from app.models.hourly_time_buckets import HourlyTimeBucket as HourlyTimeBucketModel
+from app.models.monthly_host_totals import MonthlyHostTotal as MonthlyHostTotalModel
+from app.models.raw_session_batches import RawSessionBatch as RawSessionBatchModel
+from app.routers.time import store_flush_batch_with_retry
+from app.session_log import decode_sessions
+
+
+def build_payload(hosts: list[str], session_count: int, tz: str, anchor: datetime, days: int) -> bytes:
+    """
+    Builds a payload of random sessions on the given hosts,
+    all starting within days before anchor
+    """
+    sessions = []
+    for _ in range(session_count):
+        start = anchor - timedelta(seconds=random.randint(1, days * 86400))
+        sessions.append({
+            "id": str(uuid.uuid4()),
+            "host": random.choice(hosts),
+            "start": start.isoformat(),
+            "end": (start + timedelta(seconds=random.randint(1, 5400))).isoformat(),
+        })
+    return json.dumps({"total": session_count, "timezone": tz, "sessions": sessions}).encode()
+
+async def run_flush(body: bytes, semaphore: asyncio.Semaphore, failures: Counter) -> BucketIncrements | None:
+    """
+    Prepares and stores one payload, returns its increments if stored
+    """
+    batch = prepare_flush_batch(body)
+    async with semaphore:
+        async with async_session_maker() as db:
+            try:
+                await store_flush_batch_with_retry(db, batch)
+            except Exception as e:
+                failures[f"{type(e).__name__}: {str(e).splitlines()[0]}"] += 1
+                return None
+    return batch.increments
+
+async def load_stored(host_prefix: str) -> dict[str, dict]:
+    """
+    Reads stored buckets of test hosts keyed by (hostname, date)
+    """
+    stored = {}
+    async with async_session_maker() as db:
+        for name, model, value in (
+            ("daily", DailyTimeBucketModel, DailyTimeBucketModel.duration_seconds),
+            ("hourly", HourlyTimeBucketModel, HourlyTimeBucketModel.slots),
+            ("monthly", MonthlyHostTotalModel, MonthlyHostTotalModel.duration_seconds),
+        ):
+            date_column = model.month if model is MonthlyHostTotalModel else model.date
+            result = await db.execute(
+                select(HostModel.name, date_column, value)
+                .join(HostModel, HostModel.id == model.host_id)
+                .where(HostModel.name.startswith(host_prefix))
+            )
+            stored[name] = {(host, day): value for host, day, value in result.all()}
+    return stored
+
+async def delete_test_data(host_prefix: str, after_id: int) -> int:
+    """
+    Deletes test hosts with their buckets, and logged batches past
+    after_id holding only test hosts, so they do not linger in the
+    log. Returns deleted batch count
+    """
+    async with async_session_maker() as db:
+        host_ids = set(await db.scalars(select(HostModel.id).where(HostModel.name.startswith(host_prefix))))
+        result = await db.execute(
+            select(RawSessionBatchModel.id, RawSessionBatchModel.payload)
+            .where(RawSessionBatchModel.id > after_id)
+        )
+        batch_ids = [
+            batch_id for batch_id, payload in result.all()
+            if all(host_id in host_ids for host_id, *_ in decode_sessions(payload))
+        ]
+
+        await db.execute(delete(RawSessionBatchModel).where(RawSessionBatchModel.id.in_(batch_ids)))
+        await db.execute(delete(HostModel).where(HostModel.id.in_(host_ids)))
+        await db.commit()
+    return len(batch_ids)
+
+async def main(args) -> int:
+    # Engine echoes every statement by default, far too noisy here
+    async_engine.sync_engine.echo = False
+
+    host_prefix = f"stress-{uuid.uuid4().hex[:8]}-"
+    hosts = [f"{host_prefix}{i}.example" for i in range(args.hosts)]
+    anchor = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+    bodies = [
+        build_payload(hosts, args.sessions, args.timezone, anchor, args.days)
+        for _ in range(args.flushes)
+    ]
+
+    async with async_session_maker() as db:
+        last_batch_id = await db.scalar(select(func.coalesce(func.max(RawSessionBatchModel.id), 0)))
+
+    # All flushes at once by default, excess ones wait for a pooled connection
+    concurrency = args.concurrency or args.flushes
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = Counter()
+
+    print(f"Firing {args.flushes} flushes of {args.sessions} sessions at {args.hosts} hosts, "
+          f"{concurrency} at a time")
+    results = await asyncio.gather(*[run_flush(body, semaphore, failures) for body in bodies])
+
+    expected = BucketIncrements()
+    for increments in results:
+        if increments is not None:
+            expected.merge(increments)
+
+    stored = await load_stored(host_prefix)
+    mismatches = {}
+    for name in ("daily", "hourly", "monthly"):
+        expected_rows = getattr(expected, name)
+        mismatches[name] = sum(
+            1 for key in stored[name].keys() | expected_rows.keys()
+            if stored[name].get(key) != expected_rows.get(key)
+        )
+
+    print(f"Stored {sum(result is not None for result in results)}/{args.flushes} flushes")
+    for error, count in failures.most_common():
+        print(f"  failed {count}x: {error}")
+    for name, count in mismatches.items():
+        print(f"  {name}: {len(stored[name])} rows, {count} differ from payload sums")
+
+    if not args.keep:
+        deleted = await delete_test_data(host_prefix, last_batch_id)
+        print(f"Removed {len(hosts)} test hosts and {deleted} logged batches")
+
+    await async_engine.dispose()
+
+    passed = not failures and not any(mismatches.values())
+    print("PASS" if passed else "FAIL")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent flush stress test")
+    parser.add_argument("--flushes", type=int, default=300, help="Number of parallel flushes")
+    parser.add_argument("--sessions", type=int, default=20, help="Sessions per flush")
+    parser.add_argument("--hosts", type=int, default=5, help="Shared hosts across flushes")
+    parser.add_argument("--days", type=int, default=2, help="Days the sessions are spread over")
+    parser.add_argument("--timezone", default="Europe/Warsaw", help="Timezone of flushes")
+    parser.add_argument("--concurrency", type=int, default=0,
+                        help="Flushes in flight at once, defaults to all of them")
+    parser.add_argument("--keep", action="store_true", help="Keep test hosts, buckets and logged batches")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -7,7 +7,7 @@
 
 import { browserAPI } from "../lib/browser-api.js";
 import { getUnsentSessions, markSessionsSynced, deleteSessions, getMeta, setMeta } from "../lib/storage.js";
-import { postSessions, NetworkError } from "../lib/network.js";
+import { postSessions, getOverBudgetHosts, NetworkError } from "../lib/network.js";
 
 // Configuration
 const SYNC_INTERVAL_MINUTES = 2;
@@ -51,21 +51,26 @@ export async function runSync() {
   try {
     console.log("Sync: Starting sync run");
 
+    // Get timezone from metadata
+    const meta = await getMeta();
+    const timezone = meta.timezone || Intl.DateTimeFormat().resolvedOptions().timeZone;
+
     // Get unsent sessions from storage
     const unsentSessions = await getUnsentSessions();
 
     if (unsentSessions.length === 0) {
       console.log("Sync: No unsent sessions");
+      // Budget days roll over at local midnight even without new time,
+      // a stored list is refreshed once on the next local day
+      if (meta.overBudgetHosts?.length && meta.overBudgetDate !== localDate(timezone)) {
+        await refreshOverBudgetHosts(timezone);
+      }
       await clearBackoff();
       return;
     }
 
     console.log(`Sync: Found ${unsentSessions.length} unsent sessions`);
 
-    // Get timezone from metadata
-    const meta = await getMeta();
-    const timezone = meta.timezone || Intl.DateTimeFormat().resolvedOptions().timeZone;
-
     // POST sessions to backend
     const result = await postSessions(unsentSessions, timezone);
 
@@ -87,7 +92,15 @@ export async function runSync() {
         await deleteSessions(result.rejectedSessionIds);
       }
 
-      // Clear backoff on success
+      // Keep hosts over their daily budget for the popup
+      await setMeta({ overBudgetHosts: result.overBudgetHosts, overBudgetDate: localDate(timezone) });
+
+      // Remember server-suggested interval, idle runs keep reusing it
+      if (result.nextSyncSeconds) {
+        await setMeta({ nextSyncSeconds: result.nextSyncSeconds });
+      }
+
+      // Clear backoff on success and honor server-suggested sync interval
       await clearBackoff();
 
       // Prune old synced sessions
@@ -112,7 +125,19 @@ async function handleSyncError(error) {
   const meta = await getMeta();
   const currentBackoff = meta.syncBackoffMinutes || 1;
 
-  if (error.isClientError()) {
+  if (error.isOverloaded()) {
+    // 429/503 - server is shedding load, wait as long as it asks
+    const nextBackoff = error.retryAfterSeconds
+      ? Math.min(error.retryAfterSeconds / 60, MAX_BACKOFF_MINUTES)
+      : Math.min(currentBackoff * 2, MAX_BACKOFF_MINUTES);
+    await setBackoff(nextBackoff);
+
+    console.log(`Sync: Server overloaded (${error.status}) - retrying in ${nextBackoff} minutes`);
+
+    await browserAPI.alarms.create(SYNC_ALARM_NAME, {
+      delayInMinutes: nextBackoff,
+    });
+  } else if (error.isClientError()) {
     // 4xx error - inspect and potentially drop invalid sessions
     console.log(`Sync: Client error ${error.status} - will inspect payload`);
 
@@ -145,6 +170,29 @@ async function handleSyncError(error) {
   }
 }
 
+/**
+ * Get current local date in a timezone
+ * @param {string} timezone - User's IANA timezone
+ * @returns {string} Date as YYYY-MM-DD
+ */
+function localDate(timezone) {
+  return new Date().toLocaleDateString("en-CA", { timeZone: timezone });
+}
+
+/**
+ * Refresh hosts over their daily budget on runs without a flush
+ * Failures keep the previous list, the next run retries
+ * @param {string} timezone - User's IANA timezone
+ */
+async function refreshOverBudgetHosts(timezone) {
+  try {
+    const overBudgetHosts = await getOverBudgetHosts(timezone);
+    await setMeta({ overBudgetHosts, overBudgetDate: localDate(timezone) });
+  } catch (e) {
+    console.error("Sync: Failed to refresh budget status:", e.message);
+  }
+}
+
 /**
  * Set sync backoff in metadata
  * @param {number} minutes - Backoff duration in minutes
@@ -155,14 +203,30 @@ async function setBackoff(minutes) {
 
 /**
  * Clear sync backoff (called on success)
+ * Reschedules with the last server-suggested interval, so idle
+ * clients keep their jittered schedule instead of a shared fixed one
  */
 async function clearBackoff() {
+  const meta = await getMeta();
   await setMeta({ syncBackoffMinutes: null, lastSyncError: null });
 
-  // Restore normal sync interval
+  await scheduleNextSync(meta.nextSyncSeconds || SYNC_INTERVAL_MINUTES * 60);
+}
+
+/**
+ * Schedule next sync after a server-suggested delay
+ * Repeats at the same interval until rescheduled
+ * @param {number} seconds - Delay before next sync in seconds
+ */
+async function scheduleNextSync(seconds) {
+  const delayMinutes = Math.min(seconds / 60, MAX_BACKOFF_MINUTES);
+
   await browserAPI.alarms.create(SYNC_ALARM_NAME, {
-    periodInMinutes: SYNC_INTERVAL_MINUTES,
+    delayInMinutes: delayMinutes,
+    periodInMinutes: delayMinutes,
   });
+
+  console.log(`Sync: Next sync scheduled in ${seconds} seconds`);
 }
 
 /**
@@ -10,6 +10,7 @@ import { browserAPI } from "./browser-api.js";
 // Configuration
 const DEFAULT_BACKEND_URL = "http://localhost:8000";
 const REQUEST_TIMEOUT_MS = 10000; // 10 seconds
+const COMPRESSION_MIN_BYTES = 1024; // Smaller bodies are sent uncompressed
 
 /**
  * Get backend API URL from storage or use default
@@ -61,6 +62,25 @@ export function buildSyncPayload(sessions, timezone) {
   };
 }
 
+/**
+ * Encode JSON request body, gzip-compressing it when large enough
+ * and supported by the runtime
+ * @param {Object} payload - Request payload
+ * @returns {Promise<Object>} Body and extra headers for fetch
+ */
+export async function encodeJsonBody(payload) {
+  const json = JSON.stringify(payload);
+
+  if (json.length < COMPRESSION_MIN_BYTES || typeof CompressionStream === "undefined") {
+    return { body: json, headers: {} };
+  }
+
+  const stream = new Blob([json]).stream().pipeThrough(new CompressionStream("gzip"));
+  const body = await new Response(stream).arrayBuffer();
+
+  return { body, headers: { "Content-Encoding": "gzip" } };
+}
+
 /**
  * Fetch wrapper with timeout and error handling
  * @param {string} url - URL to fetch
@@ -82,6 +102,29 @@ async function fetchWithTimeout(url, options = {}) {
   }
 }
 
+/**
+ * Parse Retry-After header value (delta-seconds or HTTP date)
+ * @param {string|null} value - Raw header value
+ * @returns {number|null} Delay in seconds or null if absent/invalid
+ */
+function parseRetryAfter(value) {
+  if (!value) {
+    return null;
+  }
+
+  const seconds = Number(value);
+  if (Number.isFinite(seconds)) {
+    return Math.max(0, seconds);
+  }
+
+  const date = Date.parse(value);
+  if (!Number.isNaN(date)) {
+    return Math.max(0, Math.round((date - Date.now()) / 1000));
+  }
+
+  return null;
+}
+
 /**
  * POST sessions to backend /time/flush endpoint
  * @param {Array<Object>} sessions - Array of session objects to sync
@@ -97,12 +140,15 @@ export async function postSessions(sessions, timezone) {
   console.log(`Network: POST ${url} with ${payload.total} sessions`);
 
   try {
+    const encoded = await encodeJsonBody(payload);
+
     const response = await fetchWithTimeout(url, {
       method: "POST",
       headers: {
         "Content-Type": "application/json",
+        ...encoded.headers,
       },
-      body: JSON.stringify(payload),
+      body: encoded.body,
     });
 
     const data = await response.json();
@@ -112,7 +158,8 @@ export async function postSessions(sessions, timezone) {
       throw new NetworkError(
         `POST /time/flush failed: ${response.status}`,
         response.status,
-        data
+        data,
+        parseRetryAfter(response.headers.get("Retry-After"))
       );
     }
 
@@ -122,6 +169,8 @@ export async function postSessions(sessions, timezone) {
       success: true,
       accepted: data.accepted,
       rejectedSessionIds: data.rejected_session_ids || [],
+      nextSyncSeconds: data.next_sync_seconds || null,
+      overBudgetHosts: data.over_budget_hosts || [],
     };
   } catch (error) {
     if (error.name === "AbortError") {
@@ -187,15 +236,120 @@ export async function getStats(period, timezone) {
   }
 }
 
+/**
+ * GET statistics for several periods from backend /time/stats/batch endpoint
+ * @param {Array<string>} periods - Period types ("week", "month", "year")
+ * @param {string} timezone - User's IANA timezone
+ * @returns {Promise<Object>} Map of period type to statistics data
+ */
+export async function getStatsBatch(periods, timezone) {
+  const baseUrl = await getBackendUrl();
+  const url = new URL(`${baseUrl}/time/stats/batch`);
+  for (const period of periods) {
+    url.searchParams.append("periods", period);
+  }
+  url.searchParams.set("timezone", timezone);
+
+  console.log(`Network: GET ${url.toString()}`);
+
+  try {
+    const response = await fetchWithTimeout(url.toString(), {
+      method: "GET",
+      headers: {
+        "Content-Type": "application/json",
+      },
+    });
+
+    const data = await response.json();
+
+    if (!response.ok) {
+      throw new NetworkError(
+        `GET /time/stats/batch failed: ${response.status}`,
+        response.status,
+        data
+      );
+    }
+
+    return Object.fromEntries(data.periods.map((stats) => [stats.period, stats]));
+  } catch (error) {
+    if (error.name === "AbortError") {
+      console.error("Network: Request timeout");
+      throw new NetworkError("Request timeout", 0, null);
+    }
+
+    if (error instanceof NetworkError) {
+      throw error;
+    }
+
+    console.error("Network: Request failed:", error.message);
+    throw new NetworkError(`Network error: ${error.message}`, 0, null);
+  }
+}
+
+/**
+ * GET today's budget status from backend /budgets/status endpoint
+ * @param {string} timezone - User's IANA timezone
+ * @returns {Promise<Array<string>>} Hostnames whose daily budget is used up
+ */
+export async function getOverBudgetHosts(timezone) {
+  const baseUrl = await getBackendUrl();
+  const url = new URL(`${baseUrl}/budgets/status`);
+  url.searchParams.set("timezone", timezone);
+
+  console.log(`Network: GET ${url.toString()}`);
+
+  try {
+    const response = await fetchWithTimeout(url.toString(), {
+      method: "GET",
+      headers: {
+        "Content-Type": "application/json",
+      },
+    });
+
+    const data = await response.json();
+
+    if (!response.ok) {
+      throw new NetworkError(
+        `GET /budgets/status failed: ${response.status}`,
+        response.status,
+        data
+      );
+    }
+
+    return data.hosts_over_budget || [];
+  } catch (error) {
+    if (error.name === "AbortError") {
+      console.error("Network: Request timeout");
+      throw new NetworkError("Request timeout", 0, null);
+    }
+
+    if (error instanceof NetworkError) {
+      throw error;
+    }
+
+    console.error("Network: Request failed:", error.message);
+    throw new NetworkError(`Network error: ${error.message}`, 0, null);
+  }
+}
+
 /**
  * Custom error class for network errors with status code
  */
 export class NetworkError extends Error {
-  constructor(message, status, data) {
+  constructor(message, status, data, retryAfterSeconds = null) {
     super(message);
     this.name = "NetworkError";
     this.status = status;
     this.data = data;
+    this.retryAfterSeconds = retryAfterSeconds;
+  }
+
+  /**
+   * Check if server shed the request due to load (429/503)
+   * @returns {boolean}
+   */
+  isOverloaded() {
+    return this.status === 429 || this.status === 503;
   }
 
   /**
@@ -5,15 +5,20 @@
  */
 
 import { browserAPI } from "../lib/browser-api.js";
-import { getStats } from "../lib/network.js";
+import { getStatsBatch } from "../lib/network.js";
 import { getUnsentSessions, getMeta, getCachedStats, setCachedStats } from "../lib/storage.js";
 import { getTimezone, splitSessionByLocalDates, aggregateByDate, getTodayInTimeZone, getDateRangeForPeriod } from "../lib/timezone.js";
 
+// Periods shown as popup tabs, prefetched in one request
+const TAB_PERIODS = ["week", "month"];
+
 // Current state
 let currentPeriod = "week";
+let prefetchedStats = null; // { timezone, stats: period -> stats } for this popup session
 let currentTimezone = getTimezone();
 let mergedData = null;
 let activeSession = null;
+let overBudgetHosts = new Set(); // hosts whose daily budget is used up, kept by sync
 let liveUpdateInterval = null;
 let isLoading = false;
 
@@ -120,6 +125,10 @@ async function loadAndRenderData() {
     // Get active session from background
     activeSession = await getActiveSessionFromBackground();
 
+    // Hosts over budget as of the last sync
+    const meta = await getMeta();
+    overBudgetHosts = new Set(meta.overBudgetHosts || []);
+
     // Merge server data with local sessions
     mergedData = mergeSessionData(serverStats, unsentSessions, activeSession, currentTimezone);
 
@@ -130,9 +139,6 @@ async function loadAndRenderData() {
     renderGraph(mergedData);
     renderTopHosts(mergedData);
 
-    // Cache the server response
-    await setCachedStats(currentPeriod, currentTimezone, serverStats);
-
     hideLoadingState();
   } catch (error) {
     console.error("Popup: Failed to load data:", error);
@@ -146,10 +152,21 @@ async function loadAndRenderData() {
  * Fetch stats from server with cache fallback
  */
 async function fetchServerStats(period, timezone) {
+  if (prefetchedStats?.timezone === timezone && prefetchedStats.stats[period]) {
+    return prefetchedStats.stats[period];
+  }
+
   try {
-    const stats = await getStats(period, timezone);
-    console.log(`Popup: Fetched stats for period=${period}, timezone=${timezone}`);
-    return stats;
+    // Fetch every tab at once so switching tabs needs no round trip
+    const stats = await getStatsBatch(TAB_PERIODS, timezone);
+    console.log(`Popup: Fetched stats for periods=${TAB_PERIODS.join(",")}, timezone=${timezone}`);
+
+    prefetchedStats = { timezone, stats };
+    for (const [tabPeriod, tabStats] of Object.entries(stats)) {
+      await setCachedStats(tabPeriod, timezone, tabStats);
+    }
+
+    return stats[period];
   } catch (error) {
     console.warn("Popup: Server fetch failed, trying cache:", error);
 
@@ -302,9 +319,13 @@ function renderActiveHost() {
 
   if (activeSession) {
     hostnameEl.textContent = activeSession.host;
+    hostnameEl.classList.toggle("over-budget", overBudgetHosts.has(activeSession.host));
+    hostnameEl.title = overBudgetHosts.has(activeSession.host) ? "Daily budget used up" : "";
     indicatorEl.classList.remove("hidden");
   } else {
     hostnameEl.textContent = "Not browsing";
+    hostnameEl.classList.remove("over-budget");
+    hostnameEl.title = "";
     indicatorEl.classList.add("hidden");
   }
 }
@@ -352,6 +373,10 @@ function renderTopHosts(data) {
   for (const host of data.top_hosts.hosts) {
     const row = document.createElement("div");
     row.className = "host-row";
+    if (overBudgetHosts.has(host.hostname)) {
+      row.classList.add("over-budget");
+      row.title = "Daily budget used up";
+    }
     row.innerHTML = `
       <span class="hostname">${host.hostname}</span>
       <span class="time">${formatTimeHM(host.seconds)}</span>